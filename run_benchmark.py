@@ -0,0 +1,150 @@
+"""
+Headless benchmark runner. Runs the gameplay scene on the SDL dummy video and audio drivers for a fixed number of
+frames, driven by a scripted controller, and reports the per-frame, per-processor and event dispatch timings, e.g.,
+
+    python run_benchmark.py overworld_crowd --frames 1200
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+
+pygame.init()
+
+from yazelc import config as cfg
+from yazelc import enemy
+from yazelc import weapons
+from yazelc.components import Position
+from yazelc.controller import Button
+from yazelc.scenes.gameplay_scene import GameplayScene
+from yazelc.scripted_controller import ScriptedController
+from yazelc.utils.game_utils import IVec
+
+OVERWORLD_MAP = Path('data', 'overworld', 'overworld_1.tmx')
+DUNGEON_MAP = Path('data', 'dungeon_1', '1_0.tmx')
+SPAWN_SIZE = 16  # Free space needed to spawn an enemy or a bomb
+SAFE_DISTANCE = 64  # Spawned entities keep this distance from the player start
+MAX_SPAWN_TRIES = 1000
+
+WALK_AROUND_SCRIPT = {0: (), 30: (Button.RIGHT,), 90: (Button.DOWN,), 150: (Button.LEFT, Button.B), 160: (Button.LEFT,),
+                      210: (Button.UP,), 270: (Button.X,), 280: ()}
+
+
+@dataclass
+class Scenario:
+    name: str
+    map_path: Path
+    start_tile: IVec
+    frames: int = 600
+    n_enemies: int = 0
+    n_bombs: int = 0
+    script: dict[int, tuple[Button, ...]] = field(default_factory=dict)
+    seed: int = 0
+
+
+SCENARIOS = {scenario.name: scenario for scenario in [
+    Scenario('overworld_idle', OVERWORLD_MAP, IVec(10, 24)),
+    Scenario('overworld_walk', OVERWORLD_MAP, IVec(10, 24), script=WALK_AROUND_SCRIPT),
+    Scenario('overworld_crowd', OVERWORLD_MAP, IVec(10, 24), n_enemies=200, n_bombs=20, script=WALK_AROUND_SCRIPT),
+    Scenario('dungeon_door', DUNGEON_MAP, IVec(2, 7), frames=300, script={2: (Button.LEFT,)}),
+]}
+
+
+@dataclass
+class BenchmarkResult:
+    scenario: Scenario
+    frame_times: list[float] = field(default_factory=list)
+    section_times: dict[str, list[float]] = field(default_factory=dict)
+
+
+def run_scenario(scenario: Scenario, window: pygame.Surface, frames: int = None) -> BenchmarkResult:
+    random.seed(scenario.seed)
+    scene = GameplayScene(window, ScriptedController(scenario.script), scenario.map_path, scenario.start_tile)
+    scene.on_enter()
+    scene.world.enable_profiling()
+    spawner = random.Random(scenario.seed)
+
+    for _ in range(scenario.n_enemies):
+        x_pos, y_pos = _find_free_spot(scene, spawner)
+        enemy.create_enemy_at(x_pos, y_pos, scene.world, spawner.randrange(2))
+
+    n_frames = frames if frames else scenario.frames
+    bomb_frames = {idx * n_frames // (scenario.n_bombs + 1) for idx in range(1, scenario.n_bombs + 1)}
+
+    result = BenchmarkResult(scenario)
+    for frame in range(n_frames):
+        if frame in bomb_frames:
+            weapons.create_bomb(Position(*_find_free_spot(scene, spawner)), scene.world)
+
+        scene.update()
+
+        profiler = scene.world.profiler
+        result.frame_times.append(profiler.last_times[profiler.FRAME_SECTION])
+        for name, section_time in profiler.last_times.items():
+            if name != profiler.FRAME_SECTION:
+                result.section_times.setdefault(name, []).append(section_time)
+
+        if scene.finished:  # The benchmark only covers a single scene
+            print(f'{scenario.name}: scene finished at frame {frame}', file=sys.stderr)
+            break
+
+    return result
+
+
+def _find_free_spot(scene: GameplayScene, rng: random.Random) -> tuple[int, int]:
+    """ Random map position away from the player start that does not overlap any map collider """
+    start_x, start_y = scene.map.get_center_coord_from_tile(*scene.start_tile_position)
+    for _ in range(MAX_SPAWN_TRIES):
+        rect = pygame.Rect(rng.randrange(scene.map.width - SPAWN_SIZE), rng.randrange(scene.map.height - SPAWN_SIZE),
+                           SPAWN_SIZE, SPAWN_SIZE)
+        if pygame.Vector2(rect.center).distance_to((start_x, start_y)) < SAFE_DISTANCE:
+            continue
+        if rect.collidelist(scene.static_colliders.query(rect)) == -1:
+            return rect.topleft
+    raise RuntimeError(f'No free spot found on {scene.map_data_file}')
+
+
+def _percentile(values: list[float], percent: float) -> float:
+    sorted_values = sorted(values)
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * percent / 100))]
+
+
+def print_report(result: BenchmarkResult):
+    rows = [('Frame', result.frame_times)]
+    rows += sorted(result.section_times.items(), key=lambda item: -statistics.fmean(item[1]))
+    print(f'{result.scenario.name}: {len(result.frame_times)} frames, {sum(result.frame_times):.2f}s')
+    print(f'{"":<24}{"mean ms":>10}{"p50 ms":>10}{"p99 ms":>10}{"max ms":>10}')
+    for name, times in rows:
+        print(f'{name:<24}{statistics.fmean(times) * 1e3:>10.3f}{_percentile(times, 50) * 1e3:>10.3f}'
+              f'{_percentile(times, 99) * 1e3:>10.3f}{max(times) * 1e3:>10.3f}')
+    print()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Runs headless benchmark scenarios of the gameplay scene')
+    parser.add_argument('scenarios', nargs='*', help=f'any of {", ".join(SCENARIOS)}, all of them if none given')
+    parser.add_argument('--frames', type=int, help='overrides the number of frames of the scenarios')
+    parser.add_argument('--json', type=Path, help='writes the raw per-frame timings (seconds) to this file')
+    args = parser.parse_args()
+    if unknown_scenarios := set(args.scenarios) - SCENARIOS.keys():
+        parser.error(f'unknown scenarios {", ".join(sorted(unknown_scenarios))}')
+
+    window = pygame.display.set_mode((cfg.RESOLUTION.x, cfg.RESOLUTION.y))
+    results = [run_scenario(SCENARIOS[name], window, args.frames) for name in args.scenarios or SCENARIOS]
+    for benchmark_result in results:
+        print_report(benchmark_result)
+
+    if args.json:
+        args.json.write_text(json.dumps({benchmark_result.scenario.name: {'frame': benchmark_result.frame_times,
+                                                                          **benchmark_result.section_times}
+                                         for benchmark_result in results}))
+    pygame.quit()
@@ -0,0 +1,89 @@
+"""
+Module loads image and sound files ahead of time on a worker thread
+"""
+import logging
+import os.path
+import threading
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional, Union
+
+import pygame
+
+PNG_FILETYPE = '.png'
+OGG_FILETYPE = '.ogg'
+
+
+class AssetPreloader:
+    """
+    Reads and decodes PNG and OGG files on a worker thread such that a later load of the same file only takes the
+    decoded asset. The images are not converted to the display format, that is left to the main thread.
+
+    Decoded assets are kept until taken or cleared
+    """
+
+    def __init__(self):
+        self._executor: Optional[ThreadPoolExecutor] = None  # Started on the first preload
+        self._lock = threading.Lock()
+        self._decoded: dict[str, Union[pygame.Surface, pygame.mixer.Sound]] = {}
+        self._stopped = False
+
+    def preload(self, get_paths: Callable[[], Iterable[Path]]):
+        """ The paths are also gathered on the worker thread, so these can come from parsing, e.g., map files """
+        if self._stopped:
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='asset_preloader')
+        self._executor.submit(self._decode_all, get_paths)
+
+    def take(self, path: Path) -> Union[pygame.Surface, pygame.mixer.Sound, None]:
+        """ Hands over the decoded asset of the file if it is ready, otherwise the caller has to load it itself """
+        with self._lock:
+            return self._decoded.pop(self._key(path), None)
+
+    def clear(self):
+        with self._lock:
+            self._decoded.clear()
+
+    def shutdown(self):
+        """ Drops the pending work, the file being decoded is finished """
+        self._stopped = True
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+        self.clear()
+
+    def _decode_all(self, get_paths: Callable[[], Iterable[Path]]):
+        # Failures are only logged, the main thread loads whatever is missing
+        try:
+            paths = list(get_paths())
+        except Exception:
+            logging.exception('Could not get the paths of the assets to preload')
+            return
+        for path in paths:
+            if self._stopped:
+                return
+            key = self._key(path)
+            with self._lock:
+                if key in self._decoded:
+                    continue
+            try:
+                asset = self._decode(path)
+            except Exception as error:
+                logging.warning(f'Could not preload {path}: {error}')
+                continue
+            with self._lock:
+                self._decoded[key] = asset
+
+    @staticmethod
+    def _decode(path: Path) -> Union[pygame.Surface, pygame.mixer.Sound]:
+        if path.suffix == PNG_FILETYPE:
+            return pygame.image.load(path)
+        elif path.suffix == OGG_FILETYPE:
+            return pygame.mixer.Sound(path)
+        else:
+            raise ValueError(f'Unknown asset filetype: {path}')
+
+    @staticmethod
+    def _key(path: Path) -> str:
+        return os.path.normpath(path)
@@ -0,0 +1,59 @@
+"""
+Module packs many small images into a few large surfaces
+"""
+from collections.abc import Mapping
+
+import pygame
+
+
+class TextureAtlas:
+    """
+    Packs the images into pages, i.e., large surfaces, row by row (shelf packing) after sorting them by height. Images
+    larger than a page get a page of their own.
+
+    The packed images are handed out as subsurfaces of their page, which share the page pixels instead of copying them
+    """
+    PAGE_SIZE = 2048
+
+    def __init__(self, images: Mapping[str, pygame.Surface], page_size: int = PAGE_SIZE):
+        self.page_size = page_size
+        self.pages: list[pygame.Surface] = []
+        self._regions: dict[str, tuple[int, pygame.Rect]] = {}  # Page index and area of each image
+        self._pack(images)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._regions
+
+    def __len__(self) -> int:
+        return len(self._regions)
+
+    def get(self, name: str) -> pygame.Surface:
+        page_idx, rect = self._regions[name]
+        return self.pages[page_idx].subsurface(rect)
+
+    def _pack(self, images: Mapping[str, pygame.Surface]):
+        page_sizes: list[list[int]] = []
+        shelf_page = None  # Index of the page being filled
+        shelf_x = shelf_y = shelf_height = 0
+        for name, image in sorted(images.items(), key=lambda item: -item[1].get_height()):
+            width, height = image.get_size()
+            if width > self.page_size or height > self.page_size:
+                self._regions[name] = (len(page_sizes), pygame.Rect(0, 0, width, height))
+                page_sizes.append([width, height])
+                continue
+            if shelf_page is not None and shelf_x + width > self.page_size:  # Next shelf
+                shelf_x, shelf_y, shelf_height = 0, shelf_y + shelf_height, 0
+            if shelf_page is None or shelf_y + height > self.page_size:  # Next page
+                shelf_page = len(page_sizes)
+                page_sizes.append([0, 0])
+                shelf_x = shelf_y = shelf_height = 0
+            self._regions[name] = (shelf_page, pygame.Rect(shelf_x, shelf_y, width, height))
+            shelf_x += width
+            shelf_height = max(shelf_height, height)
+            page_sizes[shelf_page] = [max(page_sizes[shelf_page][0], shelf_x), shelf_y + shelf_height]  # Used area
+
+        self.pages = [pygame.Surface(size, flags=pygame.SRCALPHA) for size in page_sizes]
+        for name, image in images.items():
+            page_idx, rect = self._regions[name]
+            # Adding onto the transparent page copies the pixels as they are, alpha blending would alter them
+            self.pages[page_idx].blit(image, rect, special_flags=pygame.BLEND_RGBA_ADD)
@@ -1,6 +1,10 @@
+from array import array
+from collections import OrderedDict
+from collections.abc import Callable, Iterator, Sequence
 from dataclasses import dataclass as component
 from dataclasses import field, InitVar
 from enum import Enum, auto
+from typing import Optional
 
 import pygame
 
@@ -17,7 +21,10 @@ class Position(pygame.Vector2):
     Absolute position of the entity, i.e., not the one relative to the window unless the absolute
     flag is on. This one is used for entities that should be on the screen no matter where the
     camera is positioned
+
+    Slots instead of an instance dict keep the extra attributes compact and quicker to write on every move
     """
+    __slots__ = ('absolute', 'prev_x', 'prev_y')
 
     def __init__(self, x: float = 0, y: float = 0, absolute: bool = False):
         super().__init__(x, y)
@@ -52,10 +59,12 @@ class Position(pygame.Vector2):
 
 
 class Velocity(Position):
+    __slots__ = ()
     ZERO_THRESHOLD = 1e-3
 
 
-class Acceleration(Velocity): pass
+class Acceleration(Velocity):
+    __slots__ = ()
 
 
 @component
@@ -108,12 +117,48 @@ class Renderable:
     depth: int = 100  # Depth is just over the background, i.e., background = 0, foreground, 1000, foreforeground = 2000
     width: int = field(init=False)
     height: int = field(init=False)
+    dirty: bool = field(init=False, default=False)  # Set when the image is modified in place, e.g., drawing on it
 
     def __post_init__(self):
         self.width = self.image.get_width()
         self.height = self.image.get_height()
 
 
+@component
+class ChunkedRenderable:
+    """
+    Large image, e.g., a map layer, split in square chunks. A chunk is only built, through the chunk builder callback
+    taking the chunk rect relative to the image origin, when it first enters the view. Only the most recently used
+    chunks are kept in memory
+    """
+    chunk_builder: Callable[[pygame.Rect], pygame.Surface]
+    width: int
+    height: int
+    depth: int = 0
+    chunk_size: int = 256
+    max_cached_chunks: int = 12
+    chunks: OrderedDict[tuple[int, int], pygame.Surface] = field(init=False, default_factory=OrderedDict)
+
+    def get_chunk(self, chunk_x: int, chunk_y: int) -> pygame.Surface:
+        if (chunk_x, chunk_y) in self.chunks:
+            self.chunks.move_to_end((chunk_x, chunk_y))
+        else:
+            chunk_rect = pygame.Rect(chunk_x * self.chunk_size, chunk_y * self.chunk_size, self.chunk_size, self.chunk_size)
+            self.chunks[(chunk_x, chunk_y)] = self.chunk_builder(chunk_rect.clip(0, 0, self.width, self.height))
+            if len(self.chunks) > self.max_cached_chunks:
+                self.chunks.popitem(last=False)
+        return self.chunks[(chunk_x, chunk_y)]
+
+    def visible_chunks(self, view: pygame.Rect) -> Iterator[tuple[tuple[int, int], pygame.Surface]]:
+        """ Yields the top left position (relative to the image origin) and surface of the chunks overlapping the view """
+        view = view.clip(0, 0, self.width, self.height)
+        if not view.width or not view.height:
+            return
+        for chunk_y in range(view.top // self.chunk_size, (view.bottom - 1) // self.chunk_size + 1):
+            for chunk_x in range(view.left // self.chunk_size, (view.right - 1) // self.chunk_size + 1):
+                yield (chunk_x * self.chunk_size, chunk_y * self.chunk_size), self.get_chunk(chunk_x, chunk_y)
+
+
 class MenuType(Enum):
     DEATH = auto()
     PAUSE = auto()
@@ -134,8 +179,28 @@ class Menu:
 
 
 @component
-class Particle:
+class ParticleEmitter:
+    """ Batch of one pixel particles of the same color, their positions and velocities are stored as flat arrays """
     color: pygame.Color
+    x: array = field(default_factory=lambda: array('d'))
+    y: array = field(default_factory=lambda: array('d'))
+    vel_x: array = field(default_factory=lambda: array('d'))
+    vel_y: array = field(default_factory=lambda: array('d'))
+    has_moved: bool = False
+    dot: pygame.Surface = field(init=False)
+
+    def __post_init__(self):
+        self.dot = pygame.Surface((1, 1))
+        self.dot.fill(self.color)
+
+    def add_particle(self, x: float, y: float, vel_x: float, vel_y: float):
+        self.x.append(x)
+        self.y.append(y)
+        self.vel_x.append(vel_x)
+        self.vel_y.append(vel_y)
+
+    def __len__(self):
+        return len(self.x)
 
 
 @component
@@ -167,7 +232,11 @@ class HitBox(pygame.Rect):
 
     In addition to the regular bounding hitbox we can optionally specify a "skin depth" which will define two additional
     hitboxes. These are used to implement the "soft corner collision" seen in games like Zelda: A Link to the Past.
+
+    The corner boxes and points are computed lazily, when the collision asks for them, and cached against the position and
+    size of the hitbox. Moving the hitbox, or writing any of its attributes, does not touch them
     """
+    __slots__ = ('impenetrable', 'skin_depth', 'destroy_on_contact', '_corners_key', '_corner_rects', '_corner_points')
 
     def __init__(self, x_pos: int, y_pos: int, width: int, height: int, impenetrable: bool = False, skin_depth: int = 0,
                  destroy_on_contact: bool = False):
@@ -175,54 +244,61 @@ class HitBox(pygame.Rect):
         self.impenetrable = impenetrable
         self.skin_depth = skin_depth
         self.destroy_on_contact = destroy_on_contact
-        self.corner_rects: list[pygame.Rect] = []
-        if self.skin_depth:
-            self.corner_rects = [pygame.Rect(0, 0, skin_depth, skin_depth) for _ in range(4)]
-            self._align_corner_rects_with_parent_rect()
+        self._corners_key = None
 
     def move(self, x: int, y: int) -> 'HitBox':
         """ NOTE: This is not creating a "moved" copy of the original HitBox object """
         new_hitbox = super().move(x, y)
         new_hitbox.impenetrable = self.impenetrable
         new_hitbox.skin_depth = 0  # Do not copy skin information as this will make the
-        new_hitbox.corner_rects = None
+        new_hitbox._corners_key = None
         return new_hitbox  # noqa  C implementation of pygame.Rect is aware that we are subclassing
 
-    def move_ip(self, x: int, y: int):
-        """ Move also the internal boxes """
-        super().move_ip(x, y)
-        for corner_r in self.corner_rects:
-            corner_r.move_ip(x, y)
+    @property
+    def corner_rects(self) -> list[pygame.Rect]:
+        """ Corner boxes in counterclockwise direction starting from topleft """
+        self._update_corners()
+        return self._corner_rects
+
+    @property
+    def corner_points(self) -> list[tuple[int, int]]:
+        """ Reference points next to the inner edges of the corner boxes """
+        self._update_corners()
+        return self._corner_points
 
     def collides_with_corner_points(self, rect: pygame.Rect) -> int:
-        point_list = [
-            [sum(ele) for ele in zip(self.corner_rects[0].topright, (-1, -1))],
-            [sum(ele) for ele in zip(self.corner_rects[0].bottomleft, (-1, -1))],
-            [sum(ele) for ele in zip(self.corner_rects[1].topleft, (-1, 0))],
-            [sum(ele) for ele in zip(self.corner_rects[1].bottomright, (-1, 0))],
-            self.corner_rects[2].topright,
-            self.corner_rects[2].bottomleft,
-            [sum(ele) for ele in zip(self.corner_rects[3].topleft, (0, -1))],
-            self.corner_rects[3].bottomright,
-        ]
-        for point in point_list:
+        for point in self.corner_points:
             if rect.collidepoint(*point):
                 return True
         else:
             return False
 
-    def __setattr__(self, key, value):
-        if hasattr(self, 'corner_rects') and self.corner_rects:
-            super().__setattr__(key, value)
-            self._align_corner_rects_with_parent_rect()
-        else:
-            super().__setattr__(key, value)
-
-    def _align_corner_rects_with_parent_rect(self):
-        self.corner_rects[0].topleft = self.topleft  # Define them in counterclockwise direction starting from topleft
-        self.corner_rects[1].bottomleft = self.bottomleft
-        self.corner_rects[2].bottomright = self.bottomright
-        self.corner_rects[3].topright = self.topright
+    def _update_corners(self):
+        corners_key = (self.x, self.y, self.w, self.h, self.skin_depth)
+        if corners_key == getattr(self, '_corners_key', None):
+            return
+        self._corners_key = corners_key
+        if not self.skin_depth:
+            self._corner_rects = []
+            self._corner_points = []
+            return
+
+        depth = self.skin_depth
+        top_left = pygame.Rect(self.left, self.top, depth, depth)
+        bottom_left = pygame.Rect(self.left, self.bottom - depth, depth, depth)
+        bottom_right = pygame.Rect(self.right - depth, self.bottom - depth, depth, depth)
+        top_right = pygame.Rect(self.right - depth, self.top, depth, depth)
+        self._corner_rects = [top_left, bottom_left, bottom_right, top_right]
+        self._corner_points = [
+            (top_left.right - 1, top_left.top - 1),
+            (top_left.left - 1, top_left.bottom - 1),
+            (bottom_left.left - 1, bottom_left.top),
+            (bottom_left.right - 1, bottom_left.bottom),
+            bottom_right.topright,
+            bottom_right.bottomleft,
+            (top_right.left, top_right.top - 1),
+            top_right.bottomright,
+        ]
 
 
 @component
@@ -294,18 +370,12 @@ class State:
 
 @component
 class Animation:
+    """
+    The frame sequence holds the strip index for each tick and is usually shared among entities, e.g., the ones of the
+    resource manager frame schedules. The current frame is derived from the ticks elapsed since the animation system
+    showed its first frame
+    """
     strip: list[pygame.Surface]
-    frame_sequence: list[int]
+    frame_sequence: Sequence[int]
     one_loop: bool = False
-    index: int = field(init=False)
-    frame_counter: int = field(init=False)
     is_playing: bool = field(init=False, default=True)
-
-    def __post_init__(self):
-        self.frame_counter = 0
-        self.index = 0
-
-    @classmethod
-    def from_delay(cls, strip: list[pygame.Surface], delay: int, one_loop: bool = False):
-        frame_sequence = [idx for idx in range(len(strip)) for _ in range(delay)]
-        return cls(strip, frame_sequence, one_loop)
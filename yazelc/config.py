@@ -7,7 +7,9 @@ from yazelc.utils.game_utils import IVec
 
 RESOLUTION = IVec(272, 240)
 TILE_WIDTH = 16
-DEBUG_MODE = False
+DEBUG_MODE = False  # Renders the hitboxes and the profiler overlay
+FRAME_BUDGET = 1 / 60  # Seconds, the profiler overlay highlights the sections going over it
+DIRTY_RECT_RENDERING = False  # Only redraws and updates the changed regions of the window. Meant for low power devices
 
 C_BLACK = pygame.Color(0, 0, 0)
 C_WHITE = pygame.Color(255, 255, 255)
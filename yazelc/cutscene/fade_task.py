@@ -17,8 +17,14 @@ class FadeInTask(Task):
     def update(self, world: World):
         time = self.frame_counter / (self.duration_frames - 1)
         alpha_value = tweening(time, self.tween_function) * self.MAX_ALPHA
-        image = world.component_for_entity(self.entity, Renderable).image
-        image.set_alpha(alpha_value)
+        self._set_alpha(world, alpha_value)
+
+    def _set_alpha(self, world: World, alpha_value: float):
+        renderable = world.component_for_entity(self.entity, Renderable)
+        if self.frame_counter == 0:  # The image may be a texture shared through the resource cache
+            renderable.image = renderable.image.copy()
+        renderable.image.set_alpha(alpha_value)
+        renderable.dirty = True
         self.frame_counter += 1
 
     def is_finished(self, world: World) -> bool:
@@ -30,6 +36,4 @@ class FadeOutTask(FadeInTask):
     def update(self, world: World):
         time = self.frame_counter / (self.duration_frames - 1)
         alpha_value = tweening(1 - time, self.tween_function) * self.MAX_ALPHA
-        image = world.component_for_entity(self.entity, Renderable).image
-        image.set_alpha(alpha_value)
-        self.frame_counter += 1
+        self._set_alpha(world, alpha_value)
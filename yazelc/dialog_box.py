@@ -32,6 +32,7 @@ def add_triangle_signal(dialog_entity_id: int, world: zesper.World, color: pygam
     """ Creates an entity that signals when the dialog has finished being written onto the dialog screen """
     dialog_renderable = world.component_for_entity(dialog_entity_id, cmp.Renderable)
     pygame.draw.polygon(dialog_renderable.image, color, [TRIANGLE_VERTICES_1, TRIANGLE_VERTICES_2, TRIANGLE_VERTICES_3])
+    dialog_renderable.dirty = True
 
 
 def _create_surface_background() -> pygame.Surface:
@@ -32,7 +32,8 @@ def create_jelly_at(x_pos: int, y_pos: int, world: zesper.World) -> int:
     world.add_component(enemy_entity, cmp.Enemy(JELLY_ID))
     world.add_component(enemy_entity, cmp.State(Status.IDLE, Direction.DOWN))
     image_strip = world.resource_manager.get_animation_strip('jelly_idle_down')
-    world.add_component(enemy_entity, cmp.Animation.from_delay(image_strip, JELLY_ANIMATION_DELAY))
+    frame_schedule = world.resource_manager.get_frame_schedule('jelly_idle_down', JELLY_ANIMATION_DELAY)
+    world.add_component(enemy_entity, cmp.Animation(image_strip, frame_schedule))
     world.add_component(enemy_entity, cmp.Renderable(image=image_strip[0]))
     return enemy_entity
 
@@ -48,6 +49,7 @@ def create_kefer_at(x_pos: int, y_pos: int, world: zesper.World) -> int:
     world.add_component(enemy_entity, cmp.Enemy(KEFER_ID))
     world.add_component(enemy_entity, cmp.State(Status.IDLE, Direction.DOWN))
     image_strip = world.resource_manager.get_animation_strip('kefer_idle_down')
-    world.add_component(enemy_entity, cmp.Animation.from_delay(image_strip, KEFER_ANIMATION_DELAY))
+    frame_schedule = world.resource_manager.get_frame_schedule('kefer_idle_down', KEFER_ANIMATION_DELAY)
+    world.add_component(enemy_entity, cmp.Animation(image_strip, frame_schedule))
     world.add_component(enemy_entity, cmp.Renderable(image=image_strip[0]))
     return enemy_entity
@@ -12,10 +12,15 @@ class EventManager:
     """
     Event manager that consumes (publish or broadcast) all collected events in one go
     Uses a defaultdict for subscriber storage to initialize a set when using a new (missing) key in the dict
+
+    The weak references to the handlers of each dispatched event class are collected once into a list, such that a
+    dispatch is a single dict lookup. These lists are dropped on every subscription change, including the removal of a
+    garbage collected handler. The references are only resolved on dispatch, hence the handlers are not kept alive
     """
 
     def __init__(self):
         self.subscribers = defaultdict(set)
+        self._listeners: dict[type, list[ref]] = {}
 
     def subscribe_handler_method(self, event_type: _EVENT_TYPE, handler_method: Callable[[_EVENT], None]):
         """ Subscribe handler method to event type """
@@ -31,9 +36,12 @@ class EventManager:
             self._subscribe_handler_method(event_name, handler_method)
 
     def dispatch_event(self, event: _EVENT):
-        event_name = type(event).__name__.lower()
-        for listener in self.subscribers[event_name]:
-            listener()(event)
+        listeners = self._listeners.get(type(event))
+        if listeners is None:
+            listeners = self._collect_listeners(type(event))
+        for listener in listeners:
+            if (handler := listener()) is not None:  # Dead until its callback removes it from the subscribers
+                handler(event)
 
     def remove_handler_method(self, event_type: _EVENT_TYPE, handler: Callable[[_EVENT], None]):
         event_name = event_type.__name__.lower()
@@ -44,12 +52,18 @@ class EventManager:
             self._remove_handler(event_name, handler_method)
 
     def remove_all_handlers(self, event_type: _EVENT_TYPE = None):
+        self._listeners.clear()
         if event_type:
             event_name = event_type.__name__.lower()
             self.subscribers.pop(event_name, None)
         else:
             self.subscribers = defaultdict(set)
 
+    def _collect_listeners(self, event_type: _EVENT_TYPE) -> list[ref]:
+        listeners = list(self.subscribers.get(event_type.__name__.lower(), ()))
+        self._listeners[event_type] = listeners
+        return listeners
+
     @staticmethod
     def _relevant_methods(instance: Any) -> iter:
         """ Returns the relevant method of the instance which can be subscribed """
@@ -63,6 +77,7 @@ class EventManager:
         """ Creates a callback to remove dead handlers """
 
         def callback(weak_method):
+            self._listeners.clear()
             self.subscribers[event_name].remove(weak_method)
             if not self.subscribers[event_name]:
                 self.subscribers.pop(event_name)
@@ -81,6 +96,7 @@ class EventManager:
         """ Subscribe handler method to event type """
         reference_type = self._reference_type(handler_method)
         callback_on_garbage_collection = self._make_callback(event_name)
+        self._listeners.clear()
         self.subscribers[event_name].add(reference_type(handler_method, callback_on_garbage_collection))
 
     def _remove_handler(self, event_name: str, handler: Callable[[_EVENT], None]):
@@ -90,6 +106,7 @@ class EventManager:
             return
 
         self.subscribers[event_name].remove(handler_reference)
+        self._listeners.clear()
 
         if not self.subscribers[event_name]:
             self.subscribers.pop(event_name)
@@ -1,25 +1,68 @@
+import heapq
 from collections import deque
-from typing import Any
+from enum import Enum, auto
+from itertools import count
+from typing import Any, Optional
 
-from yazelc.utils.timer import Timer
+
+class Coalescing(Enum):
+    """ Policies to merge the events of a type before they are dispatched """
+    UNIQUE = auto()  # Events equal to one already added on the same frame are dropped
+    LAST_WINS = auto()  # A pending event is replaced, in place, by the last added one of the same type
+
+
+class _PendingEvent:
+    """ Queue slot of an event which can still be replaced """
+    __slots__ = ('event',)
+
+    def __init__(self, event: Any):
+        self.event = event
 
 
 class EventQueue:
+    """
+    Delayed events are kept on a min-heap ordered by the frame they are due, so only the due ones are popped on each
+    frame. Events due on the same frame keep their insertion order
+
+    Event types can be given a coalescing policy. A frame here spans from one call to process_delayed_events to the next
+    """
 
-    def __init__(self):
+    def __init__(self, coalescing: dict[type, Coalescing] = None):
+        self.coalescing = coalescing or {}
         self._event_queue: deque[Any] = deque()  # collects all events to be fired on the next frame
-        self._event_buffer: list[Any] = list()  # collects events with delays
-        self._buffer_delays: dict[int, Timer] = dict()
+        self._frame_events: set[Any] = set()  # events of the unique policy added on this frame
+        self._pending_events: dict[type, _PendingEvent] = dict()  # by event type, of the last wins policy
+        self._delayed_events: list[list] = list()  # heap of [due frame, handle, event] entries
+        self._delayed_entries: dict[int, list] = dict()  # pending heap entries by handle, used for cancelling
+        self._handles = count()
+        self._frame = 0  # number of processed frames, i.e., calls to process_delayed_events
 
-    def add(self, event: Any, frames_delay: int = 0):
-        if frames_delay:
-            self._event_buffer.append(event)
-            self._buffer_delays[id(event)] = Timer(frames_delay)
-        else:
-            self._event_queue.append(event)
+    def add(self, event: Any, frames_delay: int = 0) -> Optional[int]:
+        """ Delayed events return a handle which can be used to cancel them """
+        if not frames_delay:
+            self._enqueue(event)
+            return None
+
+        handle = next(self._handles)
+        entry = [self._frame + frames_delay, handle, event]
+        self._delayed_entries[handle] = entry
+        heapq.heappush(self._delayed_events, entry)
+        return handle
+
+    def cancel(self, handle: int) -> bool:
+        """ Cancels a pending delayed event. Returns false if it has already been fired, cancelled or cleared """
+        entry = self._delayed_entries.pop(handle, None)
+        if entry is None:
+            return False
+        entry[2] = None  # Lazy removal, it is dropped once it reaches the top of the heap
+        return True
 
     def popleft(self) -> Any:
-        return self._event_queue.popleft()
+        event = self._event_queue.popleft()
+        if type(event) is not _PendingEvent:
+            return event
+        del self._pending_events[type(event.event)]
+        return event.event
 
     def __bool__(self):
         return bool(self._event_queue)
@@ -29,17 +72,30 @@ class EventQueue:
         Removes one frame of waiting from the delay of the events in the buffer queue.
         If the frame delay reaches zero then it adds the event to the main queue
         """
-        events_to_add = list()
-        for event in self._event_buffer:
-            timer = self._buffer_delays[id(event)]
-            timer.tick()
-            if timer.has_finished():
-                events_to_add.append(event)
-        self._event_queue.extend(events_to_add)
-        for event in events_to_add:
-            self._event_buffer.remove(event)
-            self._buffer_delays.pop(id(event))
+        self._frame += 1
+        self._frame_events.clear()
+        while self._delayed_events and self._delayed_events[0][0] <= self._frame:
+            _, handle, event = heapq.heappop(self._delayed_events)
+            if self._delayed_entries.pop(handle, None) is not None:
+                self._enqueue(event)
 
     def clear(self):
         self._event_queue.clear()
-        self._event_buffer.clear()
+        self._frame_events.clear()
+        self._pending_events.clear()
+        self._delayed_events.clear()
+        self._delayed_entries.clear()
+
+    def _enqueue(self, event: Any):
+        policy = self.coalescing.get(type(event))
+        if policy is None:
+            self._event_queue.append(event)
+        elif policy is Coalescing.UNIQUE:
+            if event not in self._frame_events:
+                self._frame_events.add(event)
+                self._event_queue.append(event)
+        elif pending_event := self._pending_events.get(type(event)):  # Coalescing.LAST_WINS
+            pending_event.event = event
+        else:
+            self._pending_events[type(event)] = pending_event = _PendingEvent(event)
+            self._event_queue.append(pending_event)
@@ -9,6 +9,7 @@ from pygame import Color
 
 from yazelc.components import Collectable
 from yazelc.controller import Controller
+from yazelc.event.event_queue import Coalescing
 from yazelc.items import CollectableItemType
 
 eventclass = partial(dataclass, frozen=True)
@@ -120,3 +121,9 @@ class ChangeSceneEvent:
     #  We define here a general string which could be also an Enum later on to label the scenes. We don't pass a reference
     #  to an actual scene (e.g., BaseScene type) because we couple the system and end up with a circular import
     next_scene: str
+
+
+# Event types merged on the event queue before being dispatched
+COALESCING_POLICIES = {
+    SoundTriggerEvent: Coalescing.UNIQUE,  # Avoids stacking the same sample on the mixer
+}
@@ -30,7 +30,9 @@ def create_hud_entity(world: zesper.World, health_points: int) -> int:
 
 
 def update_hud_keys(hud_entity_id: int, world: zesper.World, n_keys: int):
-    hud_image = world.component_for_entity(hud_entity_id, Renderable).image
+    hud_renderable = world.component_for_entity(hud_entity_id, Renderable)
+    hud_renderable.dirty = True
+    hud_image = hud_renderable.image
     font = world.resource_manager.get_font('HUD')
     text = f'KEYS: {n_keys}'
     rect = font.get_rect(text)
@@ -39,7 +41,9 @@ def update_hud_keys(hud_entity_id: int, world: zesper.World, n_keys: int):
 
 
 def update_hud_hearts(hud_entity_id: int, health_points: int, world: zesper.World):
-    hud_image = world.component_for_entity(hud_entity_id, Renderable).image
+    hud_renderable = world.component_for_entity(hud_entity_id, Renderable)
+    hud_renderable.dirty = True
+    hud_image = hud_renderable.image
     full_heart_image = world.resource_manager.get_texture(FULL_HEART_RESOURCE_NAME)
     half_heart_image = world.resource_manager.get_texture(HALF_HEART_RESOURCE_NAME)
     empty_heart_image = world.resource_manager.get_texture(EMPTY_HEART_RESOURCE_NAME)
@@ -4,16 +4,20 @@ Module deals with map data
 import json
 import logging
 import os.path
+from collections import OrderedDict, deque
+from collections.abc import Iterable
 from pathlib import Path
+from time import perf_counter
 from typing import Iterator, Optional
-from xml.etree import ElementTree
 
 import pygame
-from pytmx import TiledTileLayer, TiledMap, util_pygame, TiledObjectGroup
+from pytmx import util_pygame
 
 from yazelc import components as cmp
 from yazelc.font import Font
 from yazelc.items import CollectableItemType
+from yazelc.map_bundle import BUNDLE_SUFFIX, MAP_BUNDLES, MapBundle
+from yazelc.map_data import MAP_DATA_CACHE, MapData, TileLayerData, ObjectLayerData
 from yazelc.resource_manager import ResourceManager
 
 
@@ -25,23 +29,27 @@ class WorldMap:
         with open(self.file_path) as file:
             self._data = json.load(file)
 
+    def get_map_file_paths(self) -> list[Path]:
+        return [Path(self.file_path.parent, single_map['fileName']) for single_map in self._data['maps']]
+
     def get_needed_images_path(self) -> list[Path]:
         """ Gets the filepaths of all the tilesets used for the maps of this world """
+        if (bundle := self.get_bundle()) is not None:
+            return list(bundle.image_paths)
         image_paths = []
-        for single_map in self._data['maps']:
-            file_name = single_map['fileName']
-            file_path = Path(self.file_path.parent, file_name)
-            tree = ElementTree.parse(file_path)
-            for node in tree.findall('.//tileset'):
-                relative_path = node.get('source')
-                tileset_path = Path(self.file_path.parent, relative_path)
-                tileset_tree = ElementTree.parse(tileset_path)
-                for tileset_node in tileset_tree.findall('.//image'):
-                    image_relative_path = tileset_node.get('source')
-                    image_path = Path(tileset_path.parent, image_relative_path)
-                    image_paths.append(image_path)
+        for file_path in self.get_map_file_paths():
+            for tileset in MAP_DATA_CACHE.load(file_path).tilesets:
+                if tileset.image_path:
+                    image_paths.append(Path(tileset.image_path))
         return image_paths
 
+    def get_bundle_file_path(self) -> Path:
+        return self.file_path.with_suffix(BUNDLE_SUFFIX)
+
+    def get_bundle(self) -> Optional[MapBundle]:
+        """ The compiled maps of this world, None if not compiled or outdated """
+        return MAP_BUNDLES.get(self.get_bundle_file_path())
+
     @staticmethod
     def get_world_map_file_path(map_file_path: Path) -> Path:
         list_world_map_files = list(map_file_path.parent.glob(f'*{WorldMap.WORLD_MAP_SUFFIX}'))
@@ -56,9 +64,21 @@ class WorldMap:
         return cls(world_map_file_path)
 
 
+def load_map_data(map_file_path: Path) -> MapData:
+    """ Taken from the compiled bundle of its world if there is one up to date, otherwise parsed from the TMX file """
+    world_map_file_paths = list(map_file_path.parent.glob(f'*{WorldMap.WORLD_MAP_SUFFIX}'))
+    if len(world_map_file_paths) == 1:
+        bundle = MAP_BUNDLES.get(world_map_file_paths[0].with_suffix(BUNDLE_SUFFIX))
+        file_name = Path(os.path.relpath(map_file_path, map_file_path.parent)).as_posix()
+        if bundle is not None and file_name in bundle:
+            return bundle.get_map_data(file_name)
+    return MAP_DATA_CACHE.load(map_file_path)
+
+
 class Map:
     """
-    Loads ands stores all map entities from a TMX file
+    Loads ands stores all map entities from a TMX file, whose parsed data is cached, or from the compiled bundle of its
+    world
 
     It joins the different tiles surfaces to generate a single image map
 
@@ -81,75 +101,158 @@ class Map:
     ITEM_PROPERTY = 'item'
     FOREGROUND_LAYER_DEPTH = 1000
     GROUND_LEVEL_DEPTH = 0
+    COLLIDER_CACHE_SUFFIX = '.colliders.json'
+    LAYER_CHUNK_TILES = 16  # Side of the square chunks, in tiles, the layer images are split into
 
     def __init__(self, map_file_path: Path, resource_manager: ResourceManager):
         self.map_file_path = map_file_path
         self.resource_manager = resource_manager
-        self.tmx_data = TiledMap(str(map_file_path), image_loader=self.yazelc_tiled_image_loader)
-        self.width = self.tmx_data.width * self.tmx_data.tilewidth
-        self.height = self.tmx_data.height * self.tmx_data.tileheight
+        self.map_data = load_map_data(map_file_path)
+        self.width = self.map_data.width * self.map_data.tile_width
+        self.height = self.map_data.height * self.map_data.tile_height
+        self._tile_images: dict[int, Optional[pygame.Surface]] = {}  # By GID, created on the first use
+        self._layers: Optional[list[cmp.ChunkedRenderable]] = None
+        self._collider_rects: Optional[list[tuple[int, int, int, int]]] = None
+        self._tile_collider_rects: Optional[list[tuple[int, int, int, int]]] = None
 
         self.layer_entities = []  # TODO: Maybe remove this away and put it in some other container
         self.object_entities = []
 
-    def get_map_images(self) -> list[tuple[int, pygame.Surface]]:
-        map_width = self.tmx_data.width * self.tmx_data.tilewidth
-        map_height = self.tmx_data.height * self.tmx_data.tileheight
-        map_image = pygame.Surface((map_width, map_height), flags=pygame.SRCALPHA)
-
-        for layer in self.tmx_data.layers:
-            if layer.name == self.FOREGROUND_LAYER_NAME:
-                continue
-            if isinstance(layer, TiledTileLayer):
-                for x, y, image, in layer.tiles():
-                    map_image.blit(image, (x * self.tmx_data.tilewidth, y * self.tmx_data.tileheight))
-            elif isinstance(layer, TiledObjectGroup):
-                for obj in layer:
-                    if obj.image:
-                        map_image.blit(obj.image, (obj.x, obj.y))
-            else:
-                logging.debug(f'Ignoring {str(layer)} layer type ')
-
-        if self.FOREGROUND_LAYER_NAME in map(lambda name: name.lower(), self.tmx_data.layernames):
-            map_foreground_image = pygame.Surface((map_width, map_height), flags=pygame.SRCALPHA)
-            foreground_layer = self.tmx_data.get_layer_by_name(self.FOREGROUND_LAYER_NAME)
-            for x, y, image, in foreground_layer.tiles():
-                map_foreground_image.blit(image, (x * self.tmx_data.tilewidth, y * self.tmx_data.tileheight))
-            return [(self.GROUND_LEVEL_DEPTH, map_image), (self.FOREGROUND_LAYER_DEPTH, map_foreground_image)]
+    def get_map_layers(self) -> list[cmp.ChunkedRenderable]:
+        """
+        Gets the ground layer and, if present, the foreground layer as chunked images that are rendered lazily. These
+        are created once, such that the chunks rendered are kept for later uses of the map
+        """
+        if self._layers is not None:
+            return self._layers
+        layers = [cmp.ChunkedRenderable(lambda rect: self._render_region(rect, foreground=False), self.width, self.height,
+                                        self.GROUND_LEVEL_DEPTH, self.LAYER_CHUNK_TILES * self.map_data.tile_width)]
+        if self.FOREGROUND_LAYER_NAME in map(lambda name: name.lower(), self.map_data.layer_names):
+            layers.append(cmp.ChunkedRenderable(lambda rect: self._render_region(rect, foreground=True), self.width,
+                                                self.height, self.FOREGROUND_LAYER_DEPTH,
+                                                self.LAYER_CHUNK_TILES * self.map_data.tile_width))
         else:
             logging.info(
                 f'No foreground layer named {self.FOREGROUND_LAYER_NAME} found for the map {self.map_file_path}')
-            return [(self.GROUND_LEVEL_DEPTH, map_image)]
+        self._layers = layers
+        return layers
+
+    def _render_region(self, region: pygame.Rect, foreground: bool) -> pygame.Surface:
+        """ Blits all the tiles and object images of either the foreground or the remaining layers within the region """
+        region_image = pygame.Surface(region.size, flags=pygame.SRCALPHA)
+        tile_width, tile_height = self.map_data.tile_width, self.map_data.tile_height
+        tile_x_range = range(region.left // tile_width, (region.right - 1) // tile_width + 1)
+        tile_y_range = range(region.top // tile_height, (region.bottom - 1) // tile_height + 1)
+
+        for layer in self.map_data.layers:
+            if (layer.name.lower() == self.FOREGROUND_LAYER_NAME) != foreground:
+                continue
+            if isinstance(layer, TileLayerData):
+                for y in tile_y_range:
+                    row_start = y * layer.width
+                    for x in tile_x_range:
+                        if (gid := layer.gids[row_start + x]) and (tile_image := self.get_tile_image(gid)):
+                            region_image.blit(tile_image, (x * tile_width - region.x, y * tile_height - region.y))
+            elif isinstance(layer, ObjectLayerData):
+                for obj in layer.objects:
+                    if obj.gid and (tile_image := self.get_tile_image(obj.gid)):
+                        region_image.blit(tile_image, (obj.x - region.x, obj.y - region.y))
+        return region_image
 
     def create_colliders(self) -> Iterator[tuple]:
-        for layer_no, layer in enumerate(self.tmx_data.layers):
-            if layer.name.lower() == self.FOREGROUND_LAYER_NAME:
+        for x_pos, y_pos, width, height in self.get_collider_rects():
+            yield (cmp.HitBox(x_pos, y_pos, width, height, impenetrable=True),)
+
+    def get_collider_rects(self) -> list[tuple[int, int, int, int]]:
+        """
+        Gets the (x, y, width, height) of the static colliders of the map with the adjacent ones merged into larger
+        rects. The result is persisted next to the map file and rebuilt only when the map or one of its tilesets is newer
+        """
+        if self._collider_rects is None:
+            self._tile_collider_rects, self._collider_rects = self._load_collider_rects()
+        return self._collider_rects
+
+    def get_tile_collider_rects(self) -> list[tuple[int, int, int, int]]:
+        """ Gets the (x, y, width, height) of the static colliders of each tile, i.e., before merging them """
+        if self._tile_collider_rects is None:
+            self._tile_collider_rects, self._collider_rects = self._load_collider_rects()
+        return self._tile_collider_rects
+
+    def _load_collider_rects(self) -> tuple[list[tuple[int, int, int, int]], list[tuple[int, int, int, int]]]:
+        if self.map_data.collider_rects is not None:  # Compiled on the bundle
+            return self.map_data.tile_collider_rects, self.map_data.collider_rects
+        cache_path = self.map_file_path.with_suffix(self.COLLIDER_CACHE_SUFFIX)
+        source_mtime = max(os.path.getmtime(path) for path in self.map_data.source_paths)
+        try:
+            with open(cache_path) as file:
+                cache = json.load(file)
+            if cache['source_mtime'] == source_mtime:
+                return [tuple(rect) for rect in cache['tile_colliders']], [tuple(rect) for rect in cache['colliders']]
+        except (OSError, ValueError, KeyError):
+            pass
+
+        logging.info(f'Compiling the collider cache for the map {self.map_file_path}')
+        tile_collider_rects, collider_rects = self.compile_collider_rects(self.map_data)
+        try:
+            with open(cache_path, 'w') as file:
+                json.dump({'source_mtime': source_mtime, 'tile_colliders': tile_collider_rects, 'colliders': collider_rects},
+                          file, separators=(',', ':'))
+        except OSError:
+            logging.warning(f'Could not write the collider cache {cache_path}')
+        return tile_collider_rects, collider_rects
+
+    @classmethod
+    def compile_collider_rects(cls, map_data: MapData) -> tuple[list[tuple[int, int, int, int]],
+                                                                list[tuple[int, int, int, int]]]:
+        """ The colliders of each tile and these merged """
+        tile_collider_rects = list(cls._get_tile_collider_rects(map_data))
+        return tile_collider_rects, cls._merge_collider_rects(tile_collider_rects)
+
+    @classmethod
+    def _get_tile_collider_rects(cls, map_data: MapData) -> Iterator[tuple[int, int, int, int]]:
+        for layer in map_data.layers:
+            if layer.name.lower() == cls.FOREGROUND_LAYER_NAME:
                 continue
-            if isinstance(layer, TiledTileLayer):
-                for x, y, _, in layer.tiles():
-                    properties = self.tmx_data.get_tile_properties(x, y, layer_no)
-                    if properties and 'colliders' in properties:
-                        collider = properties['colliders'][0]  # Assume tile has a single collider box
-                        hit_box = cmp.HitBox(x * self.tmx_data.tilewidth + collider.x,
-                                             y * self.tmx_data.tileheight + collider.y, collider.width, collider.height,
-                                             impenetrable=True)
-                        yield (hit_box,)
-            elif isinstance(layer, TiledObjectGroup):
-                for obj in layer:
-                    if obj.image and hasattr(obj, 'properties') and 'colliders' in obj.properties:
-                        collider = obj.properties['colliders'][0]  # Assume tile has a single collider box
-                        hit_box = cmp.HitBox(obj.x + collider.x,
-                                             obj.y + collider.y, collider.width, collider.height,
-                                             impenetrable=True)
-                        yield (hit_box,)
-            else:
-                logging.debug(f'Ignoring {str(layer)} layer type ')
+            if isinstance(layer, TileLayerData):
+                for idx, gid in enumerate(layer.gids):
+                    if gid and (collider := map_data.get_tile_collider(gid)):  # Only the first collider box of the tile
+                        y, x = divmod(idx, layer.width)
+                        collider_x, collider_y, collider_width, collider_height = collider
+                        yield (int(x * map_data.tile_width + collider_x), int(y * map_data.tile_height + collider_y),
+                               int(collider_width), int(collider_height))
+            elif isinstance(layer, ObjectLayerData):
+                for obj in layer.objects:
+                    if obj.gid and map_data.get_tile(obj.gid) and (collider := map_data.get_tile_collider(obj.gid)):
+                        collider_x, collider_y, collider_width, collider_height = collider
+                        yield int(obj.x + collider_x), int(obj.y + collider_y), int(collider_width), int(collider_height)
+
+    @staticmethod
+    def _merge_collider_rects(rects: list[tuple[int, int, int, int]]) -> list[tuple[int, int, int, int]]:
+        """ Joins first horizontal runs of touching rects with the same height and then vertical runs of the same width """
+        horizontal_runs = []
+        for x_pos, y_pos, width, height in sorted(set(rects), key=lambda rect: (rect[1], rect[3], rect[0])):
+            if horizontal_runs:
+                run_x, run_y, run_width, run_height = horizontal_runs[-1]
+                if run_y == y_pos and run_height == height and run_x + run_width == x_pos:
+                    horizontal_runs[-1] = (run_x, run_y, run_width + width, run_height)
+                    continue
+            horizontal_runs.append((x_pos, y_pos, width, height))
+
+        merged_rects = []
+        for x_pos, y_pos, width, height in sorted(horizontal_runs, key=lambda rect: (rect[0], rect[2], rect[1])):
+            if merged_rects:
+                run_x, run_y, run_width, run_height = merged_rects[-1]
+                if run_x == x_pos and run_width == width and run_y + run_height == y_pos:
+                    merged_rects[-1] = (run_x, run_y, run_width, run_height + height)
+                    continue
+            merged_rects.append((x_pos, y_pos, width, height))
+        return merged_rects
 
     def create_interactive_objects(self, font: Font) -> Iterator[tuple]:
-        if self.INTERACTIVE_OBJECT_LAYER_NAME not in self.tmx_data.layernames:
+        if self.INTERACTIVE_OBJECT_LAYER_NAME not in self.map_data.layer_names:
             logging.info(f'No {self.INTERACTIVE_OBJECT_LAYER_NAME} layer found for the map {self.map_file_path}')
             return
-        for obj in self.tmx_data.get_layer_by_name(self.INTERACTIVE_OBJECT_LAYER_NAME):
+        for obj in self.map_data.get_layer_by_name(self.INTERACTIVE_OBJECT_LAYER_NAME).objects:
             hit_box = cmp.HitBox(obj.x, obj.y, obj.width, obj.height, impenetrable=False)
             position = cmp.Position(obj.x, obj.y)
             if self.TEXT_PROPERTY in obj.properties:
@@ -165,10 +268,10 @@ class Map:
                 yield components
 
     def create_doors(self) -> Iterator[tuple]:
-        if self.DOOR_LAYER_NAME not in self.tmx_data.layernames:
+        if self.DOOR_LAYER_NAME not in self.map_data.layer_names:
             logging.info(f'No {self.DOOR_LAYER_NAME} layer found for the map {self.map_file_path}')
             return
-        for obj in self.tmx_data.get_layer_by_name(self.DOOR_LAYER_NAME):
+        for obj in self.map_data.get_layer_by_name(self.DOOR_LAYER_NAME).objects:
             target_x = obj.properties[self.DOOR_TARGET_X_STR]
             target_y = obj.properties[self.DOOR_TARGET_Y_STR]
             map_image_sub_path = obj.properties[self.DOOR_TARGET_STR].split(self.DOOR_PATH_SEP)
@@ -178,10 +281,10 @@ class Map:
             yield door, hit_box
 
     def create_enemies(self) -> Iterator[tuple]:
-        if self.ENEMY_LAYER_NAME not in self.tmx_data.layernames:
+        if self.ENEMY_LAYER_NAME not in self.map_data.layer_names:
             logging.info(f'No {self.ENEMY_LAYER_NAME} layer found for the map {self.map_file_path}')
             return
-        for obj in self.tmx_data.get_layer_by_name(self.ENEMY_LAYER_NAME):
+        for obj in self.map_data.get_layer_by_name(self.ENEMY_LAYER_NAME).objects:
             x_pos = obj.x
             y_pos = obj.y
             enemy_type = obj.properties[self.ENEMY_PROP]
@@ -191,49 +294,107 @@ class Map:
         """
         Get tile center absolute coordinates from the position in "tile" coordinates, i.e. the one independent of the tile size
         """
-        center_x = tile_x_pos * self.tmx_data.tilewidth + int(self.tmx_data.tilewidth / 2)
-        center_y = tile_y_pos * self.tmx_data.tilewidth + int(self.tmx_data.tileheight / 2)
+        center_x = tile_x_pos * self.map_data.tile_width + int(self.map_data.tile_width / 2)
+        center_y = tile_y_pos * self.map_data.tile_width + int(self.map_data.tile_height / 2)
         return center_x, center_y
 
     def get_coord_from_tile(self, tile_x_pos: int, tile_y_pos: int) -> (int, int):
-        pos_x = tile_x_pos * self.tmx_data.tilewidth
-        pos_y = tile_y_pos * self.tmx_data.tilewidth
+        pos_x = tile_x_pos * self.map_data.tile_width
+        pos_y = tile_y_pos * self.map_data.tile_width
         return pos_x, pos_y
 
-    def yazelc_tiled_image_loader(self, filename: str, color_key: Optional[util_pygame.ColorLike], **kwargs):
+    def get_tile_image(self, gid: int) -> Optional[pygame.Surface]:
         """
-        pytmx image loader for pygame
-
-        Parameters:
-            filename: filename, including path, to load
-            color_key: color_key for the image
+        Image of the tile, taken from the tileset texture on the resource manager. Same as pytmx's pygame image loader
+        the flipped tiles and the ones of tilesets with color key are converted copies, the rest are subsurfaces of the
+        texture
+        """
+        if gid in self._tile_images:
+            return self._tile_images[gid]
+
+        tile_image = None
+        if tile := self.map_data.get_tile(gid):
+            tileset, rect, flags = tile
+            texture = self.resource_manager.get_texture(os.path.splitext(os.path.basename(tileset.image_path))[0])
+            try:
+                tile_image = texture.subsurface(rect)
+            except ValueError:
+                logging.error(f'Tile bounds outside bounds of tileset image {tileset.image_path}')
+                raise
+            if any(flags):
+                tile_image = util_pygame.handle_transformation(tile_image, flags)
+            if any(flags) or tileset.color_key:
+                color_key = pygame.Color(f'#{tileset.color_key}') if tileset.color_key else None
+                tile_image = util_pygame.smart_convert(tile_image, color_key, True)
+        self._tile_images[gid] = tile_image
+        return tile_image
+
+
+class WarmMapCache:
+    """
+    Least recently used maps, of the same world, ready to be shown, i.e., with their layer chunks rendered and their
+    collider rects computed.
 
-        Returns:
-            function to load tile images
+    Maps can be prefetched, their preparation is then split in small steps run, within a time budget, when the scene
+    has time left on a frame. It all runs on the main thread since it renders pygame surfaces
+    """
+    MAX_MAPS = 6
 
-        This is a direct copy of "pygame_image_loader" but retrieving the pygame Surfaces from the resource manager
-        """
-        if color_key:
-            color_key = pygame.Color("#{0}".format(color_key))
-
-        pixelalpha = kwargs.get("pixelalpha", True)
-        basename_no_ext = os.path.splitext(os.path.basename(filename))[0]
-        image = self.resource_manager.get_texture(basename_no_ext)
-
-        def load_image(rect=None, flags=None):
-            if rect:
-                try:
-                    tile = image.subsurface(rect)
-                except ValueError:
-                    util_pygame.logger.error("Tile bounds outside bounds of tileset image")
-                    raise
-            else:
-                tile = image.copy()
-
-            if flags:
-                tile = util_pygame.handle_transformation(tile, flags)
-
-            tile = util_pygame.smart_convert(tile, color_key, pixelalpha)
-            return tile
-
-        return load_image
+    def __init__(self, resource_manager: ResourceManager, max_maps: int = MAX_MAPS):
+        self.resource_manager = resource_manager
+        self.max_maps = max_maps
+        self._maps: OrderedDict[str, Map] = OrderedDict()
+        self._preparations: deque[Iterator[None]] = deque()
+
+    def __contains__(self, map_file_path: Path) -> bool:
+        return os.path.normpath(map_file_path) in self._maps
+
+    def get(self, map_file_path: Path) -> Map:
+        """ The cached map, or a new one, without entities """
+        key = os.path.normpath(map_file_path)
+        if (map_ := self._maps.get(key)) is None:
+            map_ = self._add(key, map_file_path)
+        else:
+            self._maps.move_to_end(key)
+        map_.layer_entities = []
+        map_.object_entities = []
+        return map_
+
+    def prefetch(self, map_file_paths: Iterable[Path]):
+        for map_file_path in map_file_paths:
+            if map_file_path not in self:
+                self._preparations.append(self._prepare(map_file_path))
+
+    def process(self, time_budget: float):
+        """ Runs preparation steps of the prefetched maps for up to the time budget in seconds """
+        start = perf_counter()
+        while self._preparations and perf_counter() - start < time_budget:
+            try:
+                next(self._preparations[0])
+            except StopIteration:
+                self._preparations.popleft()
+
+    def clear(self):
+        self._maps.clear()
+        self._preparations.clear()
+
+    def _add(self, key: str, map_file_path: Path) -> Map:
+        map_ = self._maps[key] = Map(map_file_path, self.resource_manager)
+        while len(self._maps) > self.max_maps:
+            self._maps.popitem(last=False)
+        return map_
+
+    def _prepare(self, map_file_path: Path) -> Iterator[None]:
+        key = os.path.normpath(map_file_path)
+        if key in self._maps:  # Already requested
+            return
+        map_ = self._add(key, map_file_path)
+        yield
+        map_.get_collider_rects()
+        yield
+        for layer in map_.get_map_layers():
+            n_chunks_x, n_chunks_y = -(-layer.width // layer.chunk_size), -(-layer.height // layer.chunk_size)
+            for chunk_idx in range(min(n_chunks_x * n_chunks_y, layer.max_cached_chunks)):
+                chunk_y, chunk_x = divmod(chunk_idx, n_chunks_x)
+                layer.get_chunk(chunk_x, chunk_y)
+                yield
@@ -0,0 +1,200 @@
+"""
+Module writes the parsed maps of a world into a single binary bundle and reads them back through a memory map
+
+The bundle is a header, a JSON index and a data block. The index holds the tile sizes, tilesets, object records,
+atlas image references and source modification times, while the data block holds the tile GIDs and the collider rects,
+of each tile and merged, as 32-bit little endian integer arrays, referenced from the index by offset and count
+"""
+import json
+import logging
+import mmap
+import os.path
+import struct
+import sys
+import threading
+from array import array
+from pathlib import Path
+from typing import Optional, Union
+
+from yazelc.map_data import MapData, ObjectData, ObjectLayerData, TileLayerData, TilesetData
+
+BUNDLE_SUFFIX = '.mapbundle'
+BUNDLE_MAGIC = b'YZMB'
+BUNDLE_VERSION = 2
+HEADER = struct.Struct('<4sII')  # Magic, version and size of the JSON index
+ITEM_SIZE = 4
+GID_TYPECODE = 'I'
+COLLIDER_TYPECODE = 'i'
+
+
+def write_bundle(bundle_path: Path, maps: dict[str, MapData], image_paths: list[str], source_paths: list[str]):
+    """
+    Writes the maps, by file name relative to the bundle, with their collider rects already compiled. The image paths of
+    the texture atlas and the source files are stored relative to the bundle
+    """
+    directory = os.path.dirname(bundle_path)
+    data = bytearray()
+
+    def add_array(typecode: str, values) -> list[int]:
+        values = array(typecode, values)
+        if sys.byteorder == 'big':
+            values.byteswap()
+        offset = len(data)
+        data.extend(values.tobytes())
+        return [offset, len(values)]
+
+    index = {'images': [_get_relative_path(path, directory) for path in image_paths],
+             'sources': {_get_relative_path(path, directory): os.path.getmtime(path) for path in source_paths},
+             'maps': {}}
+    for file_name, map_data in maps.items():
+        layers = []
+        for layer in map_data.layers:
+            if isinstance(layer, TileLayerData):
+                layers.append({'name': layer.name, 'width': layer.width, 'height': layer.height,
+                               'gids': add_array(GID_TYPECODE, layer.gids)})
+            else:
+                layers.append({'name': layer.name, 'objects': [
+                    [obj.id, obj.name, obj.type, obj.x, obj.y, obj.width, obj.height, obj.gid, obj.properties]
+                    for obj in layer.objects]})
+        index['maps'][file_name] = {
+            'width': map_data.width, 'height': map_data.height,
+            'tile_width': map_data.tile_width, 'tile_height': map_data.tile_height,
+            'tilesets': [{'firstgid': tileset.firstgid,
+                          'image_path': tileset.image_path and _get_relative_path(tileset.image_path, directory),
+                          'tile_width': tileset.tile_width, 'tile_height': tileset.tile_height,
+                          'columns': tileset.columns, 'rows': tileset.rows, 'margin': tileset.margin,
+                          'spacing': tileset.spacing, 'color_key': tileset.color_key,
+                          'colliders': [[tile_id, *collider] for tile_id, collider in tileset.colliders.items()]}
+                         for tileset in map_data.tilesets],
+            'layers': layers,
+            'tile_colliders': add_array(COLLIDER_TYPECODE,
+                                        [value for rect in map_data.tile_collider_rects for value in rect]),
+            'colliders': add_array(COLLIDER_TYPECODE, [value for rect in map_data.collider_rects for value in rect])}
+
+    index_bytes = json.dumps(index, separators=(',', ':')).encode()
+    index_bytes += b' ' * (-(HEADER.size + len(index_bytes)) % ITEM_SIZE)  # Aligns the arrays of the data block
+    temp_path = f'{bundle_path}.tmp'
+    with open(temp_path, 'wb') as file:
+        file.write(HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, len(index_bytes)))
+        file.write(index_bytes)
+        file.write(data)
+    os.replace(temp_path, bundle_path)
+
+
+def _get_relative_path(path: Union[str, Path], directory: str) -> str:
+    return Path(os.path.relpath(path, directory or os.curdir)).as_posix()
+
+
+class MapBundle:
+    """
+    Bundle opened through a read only memory map. The GID arrays of the maps are views on the mapped file, so these are
+    only paged in when read
+    """
+
+    def __init__(self, bundle_path: Path):
+        self.file_path = bundle_path
+        self.directory = os.path.dirname(bundle_path)
+        with open(bundle_path, 'rb') as file:
+            self._buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, index_size = HEADER.unpack_from(self._buffer)
+        if magic != BUNDLE_MAGIC or version != BUNDLE_VERSION:
+            raise ValueError(f'Not a map bundle of version {BUNDLE_VERSION}: {bundle_path}')
+        index = json.loads(self._buffer[HEADER.size:HEADER.size + index_size])
+        self._data_offset = HEADER.size + index_size
+        self._maps = index['maps']
+        self._sources = {os.path.join(self.directory, path): mtime for path, mtime in index['sources'].items()}
+        self.image_paths = [Path(self.directory, path) for path in index['images']]
+        self._map_data: dict[str, MapData] = {}
+
+    def __contains__(self, file_name: str) -> bool:
+        return file_name in self._maps
+
+    def is_outdated(self) -> bool:
+        """ Whether any of the source files still present was modified after compiling. Shipped builds lack these """
+        for path, mtime in self._sources.items():
+            if os.path.exists(path) and os.path.getmtime(path) != mtime:
+                return True
+        return False
+
+    def get_map_data(self, file_name: str) -> MapData:
+        if (map_data := self._map_data.get(file_name)) is not None:
+            return map_data
+
+        entry = self._maps[file_name]
+        tilesets = [TilesetData(tileset['firstgid'],
+                                tileset['image_path'] and os.path.join(self.directory, tileset['image_path']),
+                                tileset['tile_width'], tileset['tile_height'], tileset['columns'], tileset['rows'],
+                                tileset['margin'], tileset['spacing'], tileset['color_key'],
+                                {tile_id: tuple(collider) for tile_id, *collider in tileset['colliders']})
+                    for tileset in entry['tilesets']]
+        layers = []
+        for layer in entry['layers']:
+            if 'gids' in layer:
+                layers.append(TileLayerData(layer['name'], layer['width'], layer['height'],
+                                            self._get_array(GID_TYPECODE, *layer['gids'])))
+            else:
+                layers.append(ObjectLayerData(layer['name'], [ObjectData(*record) for record in layer['objects']]))
+        tile_collider_rects, collider_rects = (self._get_rects(*entry[name]) for name in ('tile_colliders', 'colliders'))
+
+        map_data = MapData(os.path.join(self.directory, file_name), entry['width'], entry['height'], entry['tile_width'],
+                           entry['tile_height'], tilesets, layers, [str(self.file_path)], collider_rects,
+                           tile_collider_rects)
+        self._map_data[file_name] = map_data
+        return map_data
+
+    def _get_rects(self, offset: int, count: int) -> list[tuple[int, int, int, int]]:
+        values = self._get_array(COLLIDER_TYPECODE, offset, count)
+        return [tuple(values[idx:idx + 4]) for idx in range(0, len(values), 4)]
+
+    def _get_array(self, typecode: str, offset: int, count: int) -> Union[memoryview, array]:
+        start = self._data_offset + offset
+        view = memoryview(self._buffer)[start:start + count * ITEM_SIZE].cast(typecode)
+        if sys.byteorder == 'big':
+            values = array(typecode, view)
+            values.byteswap()
+            return values
+        return view
+
+
+class MapBundleCache:
+    """
+    Opened bundles by path, reopened when the bundle file changes. Whether a bundle is outdated by its source files is
+    only checked when it is opened
+
+    It is shared with the asset preloader thread, hence guarded by a lock
+    """
+
+    def __init__(self):
+        self._bundles: dict[str, tuple[float, Optional[MapBundle]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, bundle_path: Path) -> Optional[MapBundle]:
+        """ The bundle if present and not outdated by its source files """
+        try:
+            mtime = os.path.getmtime(bundle_path)
+        except OSError:
+            return None
+        key = os.path.normpath(bundle_path)
+        with self._lock:
+            if (cached := self._bundles.get(key)) is None or cached[0] != mtime:
+                cached = self._bundles[key] = (mtime, self._open(bundle_path))
+        return cached[1]
+
+    def clear(self):
+        with self._lock:
+            self._bundles.clear()
+
+    @staticmethod
+    def _open(bundle_path: Path) -> Optional[MapBundle]:
+        try:
+            bundle = MapBundle(bundle_path)
+        except (OSError, ValueError, KeyError, struct.error) as error:
+            logging.warning(f'Could not open the map bundle {bundle_path}: {error}')
+            return None
+        if bundle.is_outdated():
+            logging.info(f'Ignoring the map bundle {bundle_path}, its source files are newer')
+            return None
+        return bundle
+
+
+MAP_BUNDLES = MapBundleCache()  # Shared by the maps and world maps
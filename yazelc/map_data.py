@@ -0,0 +1,369 @@
+"""
+Module parses the TMX maps, together with their TSX tilesets, into plain data that can be cached in memory and on disk
+"""
+import gzip
+import json
+import logging
+import os.path
+import sys
+import threading
+import zlib
+from array import array
+from base64 import b64decode
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import NamedTuple, Optional, Union
+from xml.etree import ElementTree
+
+GID_FLIPPED_X = 1 << 31
+GID_FLIPPED_Y = 1 << 30
+GID_FLIPPED_DIAGONALLY = 1 << 29
+GID_FLAGS_MASK = GID_FLIPPED_X | GID_FLIPPED_Y | GID_FLIPPED_DIAGONALLY
+
+PROPERTY_TYPES = {'bool': lambda value: value.strip().lower()[:1] in ('1', 'y', 't'), 'float': float, 'int': int,
+                  'object': int}
+
+
+class TileFlags(NamedTuple):
+    """ Same fields as pytmx's tile flags, so these can be passed to its transformation helpers """
+    flipped_horizontally: bool
+    flipped_vertically: bool
+    flipped_diagonally: bool
+
+
+NO_FLAGS = TileFlags(False, False, False)
+
+
+@dataclass
+class TilesetData:
+    firstgid: int
+    image_path: Optional[str]  # Joined to the directory of the map (and tileset) file as in the TMX and TSX files
+    tile_width: int
+    tile_height: int
+    columns: int
+    rows: int
+    margin: int = 0
+    spacing: int = 0
+    color_key: Optional[str] = None
+    colliders: dict[int, tuple[float, float, float, float]] = field(default_factory=dict)  # First box per tile id
+
+    def get_tile_rect(self, tile_id: int) -> Optional[tuple[int, int, int, int]]:
+        if not 0 <= tile_id < self.columns * self.rows:
+            return None
+        row, column = divmod(tile_id, self.columns)
+        return (self.margin + column * (self.tile_width + self.spacing), self.margin + row * (self.tile_height + self.spacing),
+                self.tile_width, self.tile_height)
+
+
+@dataclass
+class TileLayerData:
+    name: str
+    width: int
+    height: int
+    gids: array  # Row major, the GIDs keep the flip flags of the TMX file
+
+
+@dataclass
+class ObjectData:
+    id: int
+    name: Optional[str]
+    type: Optional[str]
+    x: float
+    y: float  # Top left corner also for tile objects, i.e., objects with a GID
+    width: float
+    height: float
+    gid: int
+    properties: dict
+
+
+@dataclass
+class ObjectLayerData:
+    name: str
+    objects: list[ObjectData]
+
+
+LayerData = Union[TileLayerData, ObjectLayerData]
+
+
+@dataclass
+class MapData:
+    """
+    Tile size, tilesets and layers of a TMX map. Like pytmx, the tile layers come first and then the object layers, each
+    in the file order
+    """
+    file_path: str
+    width: int  # In tiles
+    height: int
+    tile_width: int
+    tile_height: int
+    tilesets: list[TilesetData]
+    layers: list[LayerData]
+    source_paths: list[str]  # The map and tileset files it was parsed from
+    collider_rects: Optional[list[tuple[int, int, int, int]]] = None  # Merged static colliders, if compiled ahead
+    tile_collider_rects: Optional[list[tuple[int, int, int, int]]] = None  # The ones of each tile, if compiled ahead
+
+    @property
+    def layer_names(self) -> list[str]:
+        return [layer.name for layer in self.layers]
+
+    def get_layer_by_name(self, name: str) -> LayerData:
+        for layer in self.layers:
+            if layer.name == name:
+                return layer
+        raise ValueError(f'No layer named {name} on {self.file_path}')
+
+    def get_tileset(self, gid: int) -> Optional[TilesetData]:
+        """ Tileset of a GID without flags """
+        for tileset in reversed(self.tilesets):  # Sorted by first GID
+            if tileset.firstgid <= gid:
+                return tileset
+        return None
+
+    def get_tile(self, raw_gid: int) -> Optional[tuple[TilesetData, tuple[int, int, int, int], TileFlags]]:
+        """ Tileset, area within its image and flip flags of the tile, None if the GID has no image """
+        gid, flags = decode_gid(raw_gid)
+        if not gid or (tileset := self.get_tileset(gid)) is None or tileset.image_path is None:
+            return None
+        if (rect := tileset.get_tile_rect(gid - tileset.firstgid)) is None:
+            return None
+        return tileset, rect, flags
+
+    def get_tile_collider(self, raw_gid: int) -> Optional[tuple[float, float, float, float]]:
+        gid, _ = decode_gid(raw_gid)
+        if not gid or (tileset := self.get_tileset(gid)) is None:
+            return None
+        return tileset.colliders.get(gid - tileset.firstgid)
+
+
+def decode_gid(raw_gid: int) -> tuple[int, TileFlags]:
+    if raw_gid < GID_FLIPPED_DIAGONALLY:
+        return raw_gid, NO_FLAGS
+    return raw_gid & ~GID_FLAGS_MASK, TileFlags(bool(raw_gid & GID_FLIPPED_X), bool(raw_gid & GID_FLIPPED_Y),
+                                                bool(raw_gid & GID_FLIPPED_DIAGONALLY))
+
+
+def parse_properties(node: ElementTree.Element) -> dict:
+    properties = {}
+    for property_node in node.findall('properties/property'):
+        value = property_node.get('value')
+        if property_type := PROPERTY_TYPES.get(property_node.get('type')):
+            properties[property_node.get('name')] = property_type(value)
+        else:  # Multiline strings are stored as the node text
+            properties[property_node.get('name')] = value or property_node.text
+    return properties
+
+
+def parse_tileset(node: ElementTree.Element, firstgid: int, directory: str) -> TilesetData:
+    """ The image path is joined to the directory of the file holding the tileset node """
+    tile_width, tile_height = int(node.get('tilewidth')), int(node.get('tileheight'))
+    margin, spacing = int(node.get('margin', 0)), int(node.get('spacing', 0))
+    image_path, color_key, columns, rows = None, None, 0, 0
+    if (image_node := node.find('image')) is not None:
+        image_path = os.path.join(directory, image_node.get('source'))
+        color_key = image_node.get('trans')
+        image_width, image_height = int(image_node.get('width')), int(image_node.get('height'))
+        columns = len(range(margin, image_width + margin - tile_width + 1, tile_width + spacing))
+        rows = len(range(margin, image_height + margin - tile_height + 1, tile_height + spacing))
+
+    colliders = {}
+    for tile_node in node.iter('tile'):
+        if (collider_node := tile_node.find('objectgroup/object')) is not None:
+            colliders[int(tile_node.get('id'))] = tuple(float(collider_node.get(attribute, 0))
+                                                        for attribute in ('x', 'y', 'width', 'height'))
+    return TilesetData(firstgid, image_path, tile_width, tile_height, columns, rows, margin, spacing, color_key, colliders)
+
+
+def parse_tile_layer(node: ElementTree.Element) -> TileLayerData:
+    """ Same data formats as pytmx, CSV or base64 encoded, the latter uncompressed or compressed by gzip or zlib """
+    data_node = node.find('data')
+    encoding, compression = data_node.get('encoding'), data_node.get('compression')
+    if data_node.find('chunk') is not None:
+        raise ValueError(f'Infinite maps are not supported, layer {node.get("name")}')
+    if encoding == 'csv':
+        gids = array('I', (int(value) for value in data_node.text.replace('\n', '').split(',') if value))
+    elif encoding == 'base64':
+        if compression not in (None, 'gzip', 'zlib'):
+            raise ValueError(f'Layer compression {compression} is not supported, layer {node.get("name")}')
+        data = b64decode(data_node.text.strip())
+        if compression == 'gzip':
+            data = gzip.decompress(data)
+        elif compression == 'zlib':
+            data = zlib.decompress(data)
+        gids = array('I', data)
+        if sys.byteorder == 'big':  # Little endian on the TMX files
+            gids.byteswap()
+    else:
+        raise ValueError(f'Layer encoding {encoding} is not supported, layer {node.get("name")}')
+    return TileLayerData(node.get('name'), int(node.get('width')), int(node.get('height')), gids)
+
+
+def parse_template(template_path: str, tileset_firstgids: dict[str, int]) -> ElementTree.Element:
+    """ Object node of the template. Its GID, if any, is moved from the template tileset first GID to the map one """
+    root = ElementTree.parse(template_path).getroot()
+    object_node = root.find('object')
+    if raw_gid := int(object_node.get('gid', 0)):
+        tileset_node = root.find('tileset')
+        tileset_path = os.path.normpath(os.path.join(os.path.dirname(template_path), tileset_node.get('source')))
+        if tileset_path not in tileset_firstgids:
+            raise ValueError(f'The tileset {tileset_path} of the template {template_path} is not used on the map')
+        gid = (raw_gid & ~GID_FLAGS_MASK) - int(tileset_node.get('firstgid')) + tileset_firstgids[tileset_path]
+        object_node.set('gid', str(gid | raw_gid & GID_FLAGS_MASK))
+    return object_node
+
+
+def parse_object(node: ElementTree.Element, template_node: Optional[ElementTree.Element] = None) -> ObjectData:
+    """
+    The attributes and properties not set on the object are taken from its template. As pytmx, the origin of tile
+    objects is moved from the bottom to the top
+    """
+    attributes, properties = node.attrib, parse_properties(node)
+    if template_node is not None:
+        attributes = {**template_node.attrib, **attributes}
+        properties = {**parse_properties(template_node), **properties}
+    obj = ObjectData(int(attributes.get('id', 0)), attributes.get('name'),
+                     attributes.get('type') or attributes.get('class'), float(attributes.get('x', 0)),
+                     float(attributes.get('y', 0)), float(attributes.get('width', 0)),
+                     float(attributes.get('height', 0)), int(attributes.get('gid', 0)), properties)
+    if obj.gid:
+        obj.y -= obj.height
+    return obj
+
+
+def parse_tmx(map_file_path: Path) -> MapData:
+    file_path = str(map_file_path)
+    directory = os.path.dirname(file_path)
+    root = ElementTree.parse(file_path).getroot()
+
+    tilesets = []
+    tileset_firstgids = {}  # Of the external tilesets by normalized path, these are referenced from the templates
+    source_paths = [file_path]
+    for tileset_node in root.findall('tileset'):
+        firstgid = int(tileset_node.get('firstgid'))
+        if source := tileset_node.get('source'):
+            tileset_path = os.path.join(directory, source)
+            tileset_firstgids[os.path.normpath(tileset_path)] = firstgid
+            source_paths.append(tileset_path)
+            tilesets.append(parse_tileset(ElementTree.parse(tileset_path).getroot(), firstgid, os.path.dirname(tileset_path)))
+        else:
+            tilesets.append(parse_tileset(tileset_node, firstgid, directory))
+    tilesets.sort(key=lambda tileset: tileset.firstgid)
+
+    layers: list[LayerData] = [parse_tile_layer(node) for node in root.iter('layer')]
+    templates = {}
+    for node in root.iter('objectgroup'):
+        objects = []
+        for obj_node in node.findall('object'):
+            template_node = None
+            if template := obj_node.get('template'):
+                template_path = os.path.normpath(os.path.join(directory, template))
+                if template_path not in templates:
+                    templates[template_path] = parse_template(template_path, tileset_firstgids)
+                    source_paths.append(template_path)
+                template_node = templates[template_path]
+            objects.append(parse_object(obj_node, template_node))
+        layers.append(ObjectLayerData(node.get('name'), objects))
+    if root.find('.//imagelayer') is not None:
+        logging.debug(f'Ignoring the image layers of the map {file_path}')
+
+    return MapData(file_path, int(root.get('width')), int(root.get('height')), int(root.get('tilewidth')),
+                   int(root.get('tileheight')), tilesets, layers, source_paths)
+
+
+class MapDataCache:
+    """
+    Parsed maps by path, kept in memory and persisted as JSON next to the map files. An entry is used as long as the map
+    and its tileset and template files keep the modification times they had when parsed
+
+    It is shared with the asset preloader thread. The lock only guards the entries, so the same map may be parsed on
+    both threads at once, then the last one parsed is kept
+    """
+    DISK_CACHE_SUFFIX = '.mapdata.json'
+    DISK_CACHE_VERSION = 4  # Bump when the parsed data classes change
+
+    def __init__(self, persist: bool = True):
+        self.persist = persist
+        self._maps: dict[str, tuple[tuple[float, ...], MapData]] = {}
+        self._lock = threading.Lock()
+
+    def load(self, map_file_path: Path) -> MapData:
+        key = os.path.normpath(map_file_path)
+        with self._lock:
+            cached = self._maps.get(key)
+        if cached is not None:
+            source_mtimes, map_data = cached
+            if self._get_mtimes(map_data.source_paths) == source_mtimes:
+                return map_data
+
+        cache_path = Path(map_file_path).with_suffix(self.DISK_CACHE_SUFFIX)
+        map_data = self._read_disk_cache(cache_path) if self.persist else None
+        if map_data is None:
+            logging.info(f'Parsing the map {map_file_path}')
+            map_data = parse_tmx(map_file_path)
+            if self.persist:
+                self._write_disk_cache(cache_path, map_data)
+        with self._lock:
+            self._maps[key] = (self._get_mtimes(map_data.source_paths), map_data)
+        return map_data
+
+    def clear(self):
+        with self._lock:
+            self._maps.clear()
+
+    def _read_disk_cache(self, cache_path: Path) -> Optional[MapData]:
+        try:
+            with open(cache_path) as file:
+                entry = json.load(file)
+            if entry['version'] == self.DISK_CACHE_VERSION:
+                map_data = self._from_json(entry['map'])
+                if list(self._get_mtimes(map_data.source_paths) or ()) == entry['source_mtimes']:
+                    return map_data
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return None
+
+    def _write_disk_cache(self, cache_path: Path, map_data: MapData):
+        entry = {'version': self.DISK_CACHE_VERSION, 'source_mtimes': self._get_mtimes(map_data.source_paths),
+                 'map': self._to_json(map_data)}
+        temp_path = f'{cache_path}.{threading.get_ident()}.tmp'  # Both threads may write the same map
+        try:
+            with open(temp_path, 'w') as file:
+                json.dump(entry, file, separators=(',', ':'))
+            os.replace(temp_path, cache_path)
+        except OSError:
+            logging.warning(f'Could not write the map data cache {cache_path}')
+
+    @staticmethod
+    def _to_json(map_data: MapData) -> dict:
+        """ The compiled collider rects are not persisted, these are only set on the maps of a bundle """
+        tilesets = [{**asdict(tileset),
+                     'colliders': [[tile_id, *collider] for tile_id, collider in tileset.colliders.items()]}
+                    for tileset in map_data.tilesets]
+        layers = [{'name': layer.name, 'width': layer.width, 'height': layer.height, 'gids': layer.gids.tolist()}
+                  if isinstance(layer, TileLayerData) else
+                  {'name': layer.name, 'objects': [asdict(obj) for obj in layer.objects]} for layer in map_data.layers]
+        return {'file_path': map_data.file_path, 'width': map_data.width, 'height': map_data.height,
+                'tile_width': map_data.tile_width, 'tile_height': map_data.tile_height, 'tilesets': tilesets,
+                'layers': layers, 'source_paths': map_data.source_paths}
+
+    @staticmethod
+    def _from_json(entry: dict) -> MapData:
+        """ Raises a KeyError or TypeError if the entry is missing a field or has an unknown one """
+        tilesets = [TilesetData(**{**tileset, 'colliders': {tile_id: tuple(collider)
+                                                            for tile_id, *collider in tileset['colliders']}})
+                    for tileset in entry['tilesets']]
+        layers = [TileLayerData(layer['name'], layer['width'], layer['height'], array('I', layer['gids']))
+                  if 'gids' in layer else
+                  ObjectLayerData(layer['name'], [ObjectData(**obj) for obj in layer['objects']])
+                  for layer in entry['layers']]
+        return MapData(entry['file_path'], entry['width'], entry['height'], entry['tile_width'], entry['tile_height'],
+                       tilesets, layers, entry['source_paths'])
+
+    @staticmethod
+    def _get_mtimes(paths: list[str]) -> Optional[tuple[float, ...]]:
+        try:
+            return tuple(os.path.getmtime(path) for path in paths)
+        except OSError:
+            return None
+
+
+MAP_DATA_CACHE = MapDataCache()  # Shared by the maps and world maps
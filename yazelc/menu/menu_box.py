@@ -119,6 +119,7 @@ def _update_menu(input_event: InputEvent, ent_id: int, menu: cmp.Menu, world: ze
     menu.item_idx_y = max(0, min(len(menu) - 1, menu.item_idx_y))
 
     if direction_x | direction_y:
-        image_surface = world.component_for_entity(ent_id, cmp.Renderable).image
-        _refresh_menu_renderable(menu, image_surface)
+        renderable = world.component_for_entity(ent_id, cmp.Renderable)
+        _refresh_menu_renderable(menu, renderable.image)
+        renderable.dirty = True
     return menu
@@ -106,8 +106,10 @@ def create_melee_weapon(player_entity_id: int, world: zesper.World):
                                    recoil_velocity=SWORD_RECOIL_VEL))
 
     direction = world.component_for_entity(player_entity_id, cmp.State).direction
-    strip = world.resource_manager.get_animation_strip(f'wooden_sword_{direction.name}')
-    world.add_component(weapon_entity_id, cmp.Animation.from_delay(strip, ATTACK_ANIMATION_DELAY, one_loop=True))
+    strip_id = f'wooden_sword_{direction.name}'
+    strip = world.resource_manager.get_animation_strip(strip_id)
+    frame_schedule = world.resource_manager.get_frame_schedule(strip_id, ATTACK_ANIMATION_DELAY)
+    world.add_component(weapon_entity_id, cmp.Animation(strip, frame_schedule, one_loop=True))
     world.add_component(weapon_entity_id, cmp.Renderable(strip[0], SPRITE_DEPTH + 1))
     player_position = world.component_for_entity(player_entity_id, cmp.Position)
     weapon_position_x = player_position.x - (SWORD_SPRITE_WIDTH - SPRITE_SIZE) // 2
@@ -140,7 +142,8 @@ def handle_animation_for_input(ent_id: int, state: cmp.State, world: zesper.Worl
     else:
         raise RuntimeError(f'Animation frame for player not specified for the status {state.status} and direction {state.direction}')
 
-    world.add_component(ent_id, cmp.Animation.from_delay(strip, animation_frames))
+    frame_schedule = world.resource_manager.get_frame_schedule(animation_identifier, animation_frames)
+    world.add_component(ent_id, cmp.Animation(strip, frame_schedule))
 
 
 def handle_input(input_event: InputEvent, player_entity_id: int, world: zesper.World):
@@ -214,6 +217,7 @@ def handle_input(input_event: InputEvent, player_entity_id: int, world: zesper.W
 
     elif input_event.controller.is_button_pressed(Button.SELECT):
         cfg.DEBUG_MODE = not cfg.DEBUG_MODE
+        world.enable_profiling(cfg.DEBUG_MODE)
 
     if state.has_changed():
         handle_animation_for_input(player_entity_id, state, world)
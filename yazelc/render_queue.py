@@ -0,0 +1,58 @@
+from bisect import insort
+from collections.abc import Iterator
+from typing import Any
+
+
+class RenderQueue:
+    """
+    Renderable components of the world bucketed by depth. The depths are kept sorted so iterating over the queue yields
+    the (entity, renderable) pairs in drawing order without sorting them on every frame. Entities are drawn in the
+    order they joined their depth bucket. The tracked component types are only required to have a depth attribute
+    """
+
+    def __init__(self, *component_types: type):
+        self.component_types = component_types
+        self._depths: list[int] = []
+        self._buckets: dict[int, dict[int, Any]] = {}
+        self._entity_depths: dict[int, int] = {}
+
+    def tracks(self, component: Any) -> bool:
+        return isinstance(component, self.component_types)
+
+    def get(self, entity: int) -> Any:
+        return self._buckets[self._entity_depths[entity]][entity]
+
+    def add(self, entity: int, renderable: Any):
+        """ Adds or replaces the renderable of the entity """
+        self.remove(entity)
+        depth = renderable.depth
+        if depth not in self._buckets:
+            insort(self._depths, depth)
+            self._buckets[depth] = {}
+        self._buckets[depth][entity] = renderable
+        self._entity_depths[entity] = depth
+
+    def remove(self, entity: int):
+        depth = self._entity_depths.pop(entity, None)
+        if depth is None:
+            return
+        bucket = self._buckets[depth]
+        del bucket[entity]
+        if not bucket:
+            del self._buckets[depth]
+            self._depths.remove(depth)
+
+    def clear(self):
+        self._depths.clear()
+        self._buckets.clear()
+        self._entity_depths.clear()
+
+    def __contains__(self, entity: int) -> bool:
+        return entity in self._entity_depths
+
+    def __len__(self) -> int:
+        return len(self._entity_depths)
+
+    def __iter__(self) -> Iterator[tuple[int, Any]]:
+        for depth in self._depths:
+            yield from self._buckets[depth].items()
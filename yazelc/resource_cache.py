@@ -0,0 +1,98 @@
+"""
+Module keeps the loaded resources across scenes
+"""
+from collections import OrderedDict
+from collections.abc import Hashable
+from dataclasses import dataclass
+from enum import Enum, auto
+from typing import Any, Optional
+
+import pygame
+
+
+class ResourceCategory(Enum):
+    TEXTURE = auto()  # Surfaces or lists of them
+    SOUND = auto()
+    FONT = auto()
+
+
+@dataclass
+class _CacheEntry:
+    resource: Any
+    size: int
+    ref_count: int = 1
+
+
+class ResourceCache:
+    """
+    Process-wide store of the resources loaded by the resource managers of all scenes. The resources are reference
+    counted, each resource manager holds one reference to each resource it uses until it is released.
+
+    Unreferenced resources are kept, such that restarting or going back to a world finds them already loaded, until the
+    memory budget of their category is exceeded. Then the least recently released ones are evicted first. Referenced
+    resources are never evicted, so the budget can be exceeded while these are in use
+    """
+    BUDGETS = {ResourceCategory.TEXTURE: 128 * 2 ** 20, ResourceCategory.SOUND: 32 * 2 ** 20}  # Bytes, no budget for fonts
+
+    def __init__(self, budgets: Optional[dict[ResourceCategory, int]] = None):
+        self.budgets = dict(self.BUDGETS if budgets is None else budgets)
+        self._entries: dict[tuple[ResourceCategory, Hashable], _CacheEntry] = {}
+        self._unreferenced: dict[ResourceCategory, OrderedDict[Hashable, None]] = {category: OrderedDict()
+                                                                                  for category in ResourceCategory}
+        self._sizes = {category: 0 for category in ResourceCategory}
+
+    def __contains__(self, category_key: tuple[ResourceCategory, Hashable]) -> bool:
+        return category_key in self._entries
+
+    def acquire(self, category: ResourceCategory, key: Hashable) -> Optional[Any]:
+        """ Returns the resource taking a reference to it, None if not cached """
+        if (entry := self._entries.get((category, key))) is None:
+            return None
+        if entry.ref_count == 0:
+            del self._unreferenced[category][key]
+        entry.ref_count += 1
+        return entry.resource
+
+    def add(self, category: ResourceCategory, key: Hashable, resource: Any, size: int = None) -> Any:
+        """ Stores the resource, already referenced once. Its size in bytes is estimated if not given """
+        if (category, key) in self._entries:
+            raise KeyError(f'Resource {key} already cached')
+        size = self.get_size(category, resource) if size is None else size
+        self._entries[(category, key)] = _CacheEntry(resource, size)
+        self._sizes[category] += size
+        self._evict(category)
+        return resource
+
+    def release(self, category: ResourceCategory, key: Hashable):
+        entry = self._entries[(category, key)]
+        entry.ref_count -= 1
+        if entry.ref_count == 0:
+            self._unreferenced[category][key] = None
+            self._evict(category)
+
+    def size(self, category: ResourceCategory) -> int:
+        return self._sizes[category]
+
+    def clear(self):
+        self._entries.clear()
+        for category in ResourceCategory:
+            self._unreferenced[category].clear()
+            self._sizes[category] = 0
+
+    def _evict(self, category: ResourceCategory):
+        budget = self.budgets.get(category)
+        unreferenced = self._unreferenced[category]
+        while budget is not None and self._sizes[category] > budget and unreferenced:
+            key, _ = unreferenced.popitem(last=False)
+            self._sizes[category] -= self._entries.pop((category, key)).size
+
+    @staticmethod
+    def get_size(category: ResourceCategory, resource: Any) -> int:
+        """ Estimated memory in bytes of the pixels of the textures and of the samples of the sounds """
+        if category == ResourceCategory.TEXTURE:
+            surfaces = resource if isinstance(resource, list) else [resource]
+            return sum(surface.get_width() * surface.get_height() * surface.get_bytesize() for surface in surfaces)
+        elif category == ResourceCategory.SOUND and (mixer_settings := pygame.mixer.get_init()):
+            frequency, sample_format, channels = mixer_settings
+            return round(resource.get_length() * frequency) * channels * abs(sample_format) // 8
+        return 0
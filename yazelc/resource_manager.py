@@ -1,12 +1,18 @@
 import logging
+import os.path
+from collections.abc import Callable, Hashable, Iterable
 from enum import Enum
 from pathlib import Path
+from typing import Optional, Any
 
 import pygame
 import pygame.freetype
 
 from yazelc import animation
+from yazelc.asset_preloader import AssetPreloader
+from yazelc.atlas import TextureAtlas
 from yazelc.font import Font
+from yazelc.resource_cache import ResourceCache, ResourceCategory
 from yazelc.utils.game_utils import Direction, Status
 
 
@@ -17,17 +23,39 @@ class SupportedFiletypes(Enum):
 
 
 class ResourceManager:
-    # TODO: HERE WE WOULD ALSO INITIALIZE THE SOUND RESOURCES
+    """
+    Resources, by name, used by a scene. The loaded files are taken from, or stored on, the resource cache, which can be
+    shared with the managers of other scenes. The manager holds a reference on the cache to every file it has loaded
+    until it is released
+    """
     TRUE_TYPE_FONT_FILETYPE = '.ttf'
     PNG_FILETYPE = '.png'
     OGG_FILETYPE = '.ogg'
 
-    def __init__(self):
+    def __init__(self, cache: Optional[ResourceCache] = None, preloader: Optional[AssetPreloader] = None):
+        self.cache = cache if cache else ResourceCache()
+        self.preloader = preloader  # Files already decoded by it are taken from it instead of loaded
         self._textures = {}
+        self._atlases: list[TextureAtlas] = []
         self._animation_stripes = {}
         self._fonts = {}
         self._sounds = {}
-        self._pygame_font_objects = {}  # keeps track of pygame's loaded fonts (not the wrapper)
+        self._frame_schedules: dict[tuple[str, int], tuple[int, ...]] = {}
+        self._cache_references: list[tuple[ResourceCategory, Hashable]] = []
+
+    def release(self):
+        """ Drops all the resources, releasing their references on the cache """
+        for category, key in self._cache_references:
+            self.cache.release(category, key)
+        self._cache_references.clear()
+        for resources in (self._textures, self._atlases, self._animation_stripes, self._fonts, self._sounds,
+                          self._frame_schedules):
+            resources.clear()
+
+    def is_cached(self, path: Path) -> bool:
+        """ Whether the image or sound file is already loaded on the cache """
+        category = ResourceCategory.SOUND if path.suffix == self.OGG_FILETYPE else ResourceCategory.TEXTURE
+        return (category, self._get_key(path)) in self.cache
 
     def add_texture(self, path: Path, explicit_name: str = None) -> pygame.Surface:
         """ Uses file name stem if explicit name is not passed """
@@ -35,7 +63,8 @@ class ResourceManager:
         file_type = path.suffix
         if name not in self._textures:
             if file_type == self.PNG_FILETYPE:
-                texture = pygame.image.load(path).convert_alpha()
+                texture = self._acquire(ResourceCategory.TEXTURE, self._get_key(path),
+                                        lambda: self._load_image(path).convert_alpha())
                 self._textures.update({name: texture})
                 return texture
             else:
@@ -44,13 +73,39 @@ class ResourceManager:
             logging.info(f'Image on {path} has an existing texture instance with the id {name}')
             return self.get_texture(name)
 
+    def add_texture_atlas(self, paths: Iterable[Path]) -> TextureAtlas:
+        """
+        Loads the images not loaded yet, with the file name stem as name, packed together on a texture atlas. The
+        textures are then regions of the atlas pages instead of separate surfaces. Images found on the cache are not
+        packed again
+        """
+        images = {}
+        image_keys = {}
+        for path in paths:
+            if path.stem in self._textures or path.stem in images:
+                continue
+            if path.suffix != self.PNG_FILETYPE:
+                raise ValueError(f'Unknown texture filetype: {path}')
+            key = self._get_key(path)
+            if (texture := self.cache.acquire(ResourceCategory.TEXTURE, key)) is not None:
+                self._cache_references.append((ResourceCategory.TEXTURE, key))
+                self._textures[path.stem] = texture
+                continue
+            images[path.stem] = self._load_image(path).convert_alpha()
+            image_keys[path.stem] = key
+        atlas = TextureAtlas(images)
+        self._atlases.append(atlas)
+        for name in images:
+            self._textures[name] = self._acquire(ResourceCategory.TEXTURE, image_keys[name], lambda: atlas.get(name))
+        return atlas
+
     def add_sound(self, path: Path, explicit_name: str = None) -> pygame.mixer.Sound:
         """ Uses file name stem if explicit name is not passed """
         name = path.stem if not explicit_name else explicit_name
         file_type = path.suffix
         if name not in self._sounds:
             if file_type == self.OGG_FILETYPE:
-                sound = pygame.mixer.Sound(path)
+                sound = self._acquire(ResourceCategory.SOUND, self._get_key(path), lambda: self._load_sound(path))
                 self._sounds.update({name: sound})
                 return sound
             else:
@@ -64,15 +119,16 @@ class ResourceManager:
         Uses file name stem if explicit name is not passed
 
         Pygame's font objects are expensive to load. If we want to instantiate the same wrapper font instance
-        with, e.g, different colors and sizes, then they will use the same reference to the pygame's freetype font
+        with, e.g, different colors, then they will use the same reference to the pygame's freetype font. Each size is
+        a different freetype font
         """
         name = path.stem if not explicit_name else explicit_name
         file_type = path.suffix
         if name not in self._fonts:
             if file_type == self.TRUE_TYPE_FONT_FILETYPE:
-                if path not in self._pygame_font_objects:
-                    self._pygame_font_objects.update({path: pygame.freetype.Font(path, size=size)})
-                font = Font(self._pygame_font_objects[path], color)
+                pygame_font = self._acquire(ResourceCategory.FONT, (self._get_key(path), size),
+                                            lambda: pygame.freetype.Font(path, size=size))
+                font = Font(pygame_font, color)
                 self._fonts.update({name: font})
                 return font
             else:
@@ -89,15 +145,40 @@ class ResourceManager:
         texture = self.add_texture(path, explicit_name)
         name = path.stem if not explicit_name else explicit_name
         if name not in self._animation_stripes:
-            strip = animation.get_frames_from_strip(texture, sprite_width)
-            if flip:
-                strip = animation.flip_strip_sprites(strip)
+            if flip:  # Unlike the frames, which are subsurfaces of the texture, the flipped ones are new surfaces
+                strip = self._acquire(ResourceCategory.TEXTURE, (self._get_key(path), sprite_width, flip),
+                                      lambda: animation.flip_strip_sprites(
+                                          animation.get_frames_from_strip(texture, sprite_width)))
+            else:
+                strip = animation.get_frames_from_strip(texture, sprite_width)
             self._animation_stripes.update({name: strip})
             return strip
 
     def add_animation_alias(self, name: str, alias: str):
         animation_strip = self.get_animation_strip(name)
         self._animation_stripes.update({alias: animation_strip})
+        self._frame_schedules = {key: schedule for key, schedule in self._frame_schedules.items() if key[0] != alias}
+
+    def _acquire(self, category: ResourceCategory, key: Hashable, load: Callable[[], Any]) -> Any:
+        """ Takes a reference to the cached resource, loading and caching it first if missing """
+        if (resource := self.cache.acquire(category, key)) is None:
+            resource = self.cache.add(category, key, load())
+        self._cache_references.append((category, key))
+        return resource
+
+    @staticmethod
+    def _get_key(path: Path) -> str:
+        return os.path.normpath(path)
+
+    def _load_image(self, path: Path) -> pygame.Surface:
+        if self.preloader and (image := self.preloader.take(path)) is not None:
+            return image
+        return pygame.image.load(path)
+
+    def _load_sound(self, path: Path) -> pygame.mixer.Sound:
+        if self.preloader and (sound := self.preloader.take(path)) is not None:
+            return sound
+        return pygame.mixer.Sound(path)
 
     def get_texture(self, name: str) -> pygame.Surface:
         return self._textures[name]
@@ -111,6 +192,14 @@ class ResourceManager:
     def get_animation_strip(self, name: str) -> list[pygame.Surface]:
         return self._animation_stripes[name]
 
+    def get_frame_schedule(self, name: str, delay: int) -> tuple[int, ...]:
+        """ Strip index for each tick of the animation strip showing each frame <delay> ticks. Shared by all callers """
+        key = (name, delay)
+        if (schedule := self._frame_schedules.get(key)) is None:
+            n_frames = len(self.get_animation_strip(name))
+            schedule = self._frame_schedules[key] = tuple(idx for idx in range(n_frames) for _ in range(delay))
+        return schedule
+
     @staticmethod
     def get_animation_identifier(name_id: str, status: Status, direction: Direction = None) -> str:
         if direction:
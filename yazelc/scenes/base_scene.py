@@ -1,13 +1,17 @@
 import abc
+from time import perf_counter
 from typing import Optional
 
 import pygame
 
+from yazelc import config as cfg
 from yazelc import zesper
+from yazelc.asset_preloader import AssetPreloader
 from yazelc.controller import Controller
 from yazelc.event.event_manager import EventManager
 from yazelc.event.event_queue import EventQueue
-from yazelc.event.events import InputEvent, ChangeSceneEvent
+from yazelc.event.events import InputEvent, ChangeSceneEvent, COALESCING_POLICIES
+from yazelc.resource_cache import ResourceCache
 from yazelc.resource_manager import ResourceManager
 
 
@@ -15,25 +19,39 @@ class BaseScene(abc.ABC):
     """
     Base implementation for all scenes. This class is abstract and should not be instantiated.
     """
+    # Shared by all scenes, such that one can preload the assets of the next one and the loaded ones outlive the scenes
+    asset_preloader = AssetPreloader()
+    resource_cache = ResourceCache()
 
     def __init__(self, window: pygame.Surface, controller: Controller):
         self.window: pygame.Surface = window
-        self.resource_manager: ResourceManager = ResourceManager()
+        self.resource_manager: ResourceManager = ResourceManager(self.resource_cache, self.asset_preloader)
         self.event_manager: EventManager = EventManager()
-        self.event_queue: EventQueue = EventQueue()
+        self.event_queue: EventQueue = EventQueue(COALESCING_POLICIES)
         self.world: zesper.World = zesper.World(self.resource_manager, self.event_queue)
         self.controller: Controller = controller
         self.next_scene: Optional['BaseScene'] = None
         self.finished: bool = False
         self.event_manager.subscribe_handler_method(ChangeSceneEvent, self.on_change_scene)
+        self.world.enable_profiling(cfg.DEBUG_MODE)
 
     @abc.abstractmethod
     def on_enter(self):
         pass
 
     def update(self):
-        self._process_event_queue()
+        if (profiler := self.world.profiler) is None:
+            self._process_event_queue()
+            self.world.process()
+            return
+
+        profiler.new_frame()
+        frame_start = perf_counter()
+        with profiler.pause():  # Handlers may process the world, e.g., for transitions, that counts as event dispatch
+            self._process_event_queue()
+        profiler.record(profiler.EVENT_DISPATCH_SECTION, perf_counter() - frame_start)
         self.world.process()
+        profiler.record(profiler.FRAME_SECTION, perf_counter() - frame_start)
 
     @abc.abstractmethod
     def on_exit(self):
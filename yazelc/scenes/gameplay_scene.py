@@ -16,7 +16,7 @@ from yazelc.camera import Camera
 from yazelc.controller import Controller
 from yazelc.event import events
 from yazelc.items import CollectableItemType
-from yazelc.map import Map, WorldMap
+from yazelc.map import Map, WarmMapCache, WorldMap
 from yazelc.menu import menu_box
 from yazelc.player import player
 from yazelc.scenes import transition_effects
@@ -37,6 +37,7 @@ from yazelc.systems.sound_system import SoundSystem
 from yazelc.systems.tween_system import TweenSystem
 from yazelc.systems.visual_effects_system import VisualEffectsSystem
 from yazelc.utils.game_utils import Direction, IVec
+from yazelc.utils.spatial_grid import SpatialGrid
 
 FULL_HEART_IMAGE_PATH = Path('assets', 'sprites', 'full_heart.png')
 PLAYER_IMAGE_PATH = Path('assets', 'sprites', 'player')
@@ -53,6 +54,7 @@ SOUND_EFFECTS_PATH = Path('assets', 'sounds')
 ZERO_THRESHOLD = 1e-2
 BOMB_IMG_PATH = Path('assets', 'sprites', 'bomb.png')
 MAP_VELOCITY_TRANSITION = 4
+MAP_PREFETCH_TIME_BUDGET = 0.002  # Seconds per frame spent preparing the rooms behind the doors
 PROCESSOR_PRIORITY = {system: idx + 1 for idx, system in enumerate(reversed(
     [PlayerInputSystem,
      AISystem,
@@ -80,16 +82,22 @@ class GameplayScene(BaseScene):
         self.start_tile_position = start_tile_position
         self.camera: Optional[Camera] = None
         self.map: Optional[Map] = None
+        self.map_cache: Optional[WarmMapCache] = None
         self.player_entity_id: Optional[int] = None
         self.music_path = music_path
         self._player_components = player_components
         self._cached_scene_processors: list[zesper.Processor] = []
+        self.static_colliders = SpatialGrid(cfg.TILE_WIDTH)  # Broad phase for the impenetrable map colliders
+        self.static_tile_colliders = SpatialGrid(cfg.TILE_WIDTH)  # The colliders of each tile before merging
 
     def on_enter(self):
 
         self._load_resources()
+        self.asset_preloader.clear()  # Drop what was preloaded for other worlds
+        self.map_cache = WarmMapCache(self.world.resource_manager)
         self._generate_map()
         self._generate_objects()
+        self._prefetch_neighbours()
 
         if self.music_path:
             pygame.mixer.music.load(self.music_path)
@@ -131,7 +139,7 @@ class GameplayScene(BaseScene):
         input_system = PlayerInputSystem(self.player_entity_id)
         vfx_system = VisualEffectsSystem()
         entity_removal_system = EntityRemovalSystem()
-        collision_system = CollisionSystem()
+        collision_system = CollisionSystem(self.static_colliders, self.static_tile_colliders)
         hud_system = HudSystem(hud_entity_id)
         ai_system = AISystem()
         sound_system = SoundSystem()
@@ -150,7 +158,7 @@ class GameplayScene(BaseScene):
         self.world.add_processor(entity_removal_system, PROCESSOR_PRIORITY[EntityRemovalSystem])
         self.world.add_processor(AnimationSystem(), PROCESSOR_PRIORITY[AnimationSystem])
         self.world.add_processor(sound_system, PROCESSOR_PRIORITY[SoundSystem])
-        self.world.add_processor(RenderSystem(self.window, self.camera), PROCESSOR_PRIORITY[RenderSystem])
+        self.world.add_processor(RenderSystem(self.window, self.camera, cfg.DIRTY_RECT_RENDERING), PROCESSOR_PRIORITY[RenderSystem])
 
         # Register events
         self.event_manager.subscribe_handler(input_system)
@@ -173,14 +181,11 @@ class GameplayScene(BaseScene):
         """ Should load all resources for a given scene """
         # TODO: Do not use the resource manager instance reference  within the world instance but the one on this parent node
         world_map = WorldMap.from_map_file_path(self.map_data_file)
-        for tileset_image_path in world_map.get_needed_images_path():
-            # We load all the resources for all maps in the particular world
-            self.world.resource_manager.add_texture(tileset_image_path)
+        # We load all the tilesets for all maps in the particular world, packed together with the HUD images
+        self.world.resource_manager.add_texture_atlas([*world_map.get_needed_images_path(), FULL_HEART_IMAGE_PATH,
+                                                       HALF_HEART_IMAGE_PATH, EMPTY_HEART_IMAGE_PATH])
         self.world.resource_manager.add_font(FONT_PATH, FONT_SIZE, FONT_COLOR, dialog_box.DIALOG_FONT_ID)
         self.world.resource_manager.add_font(FONT_PATH, FONT_SIZE, FONT_COLOR, menu_box.MENU_FONT_ID)
-        self.world.resource_manager.add_texture(FULL_HEART_IMAGE_PATH)
-        self.world.resource_manager.add_texture(HALF_HEART_IMAGE_PATH)
-        self.world.resource_manager.add_texture(EMPTY_HEART_IMAGE_PATH)
         self.world.resource_manager.add_animation_strip(TREASURE_IMAGE_PATH, InventorySystem.TREASURE_TILE_SIZE,
                                                         explicit_name=InventorySystem.TREASURE_TEXTURE_ID)
         self.world.resource_manager.add_animation_strip(COINS_IMAGE_PATH, items.COIN_TILE_SIZE,
@@ -205,24 +210,57 @@ class GameplayScene(BaseScene):
                 img_path = WEAPON_IMAGE_PATH / f'wooden_sword_{Direction.RIGHT.name}.png'.lower()
             self.world.resource_manager.add_animation_strip(img_path, player.SWORD_SPRITE_WIDTH, flip, identifier)
 
+    def update(self):
+        super().update()
+        self.map_cache.process(MAP_PREFETCH_TIME_BUDGET)
+
+    def _prefetch_neighbours(self):
+        """
+        Prepares the rooms of this world the map doors lead to, such that crossing the door swaps them in, and decodes
+        in the background the assets, not cached yet, of the other worlds
+        """
+        target_maps = {door.target_map for door, _ in self.map.create_doors() if door.target_map.is_file()}
+        self.map_cache.prefetch(target_map for target_map in target_maps
+                                if target_map.parent == self.map_data_file.parent)
+        target_maps = {target_map for target_map in target_maps if target_map.parent != self.map_data_file.parent}
+        if target_maps:
+            self.asset_preloader.preload(lambda: [path for target_map in target_maps
+                                                  for path in self._get_asset_paths(target_map)
+                                                  if not self.resource_manager.is_cached(path)])
+
+    def _get_asset_paths(self, map_file_path: Path) -> list[Path]:
+        """ Image and sound files loaded by _load_resources for a map """
+        world_map = WorldMap.from_map_file_path(map_file_path)
+        paths = [*world_map.get_needed_images_path(), FULL_HEART_IMAGE_PATH, HALF_HEART_IMAGE_PATH,
+                 EMPTY_HEART_IMAGE_PATH, TREASURE_IMAGE_PATH, COINS_IMAGE_PATH, BOMB_IMG_PATH]
+        paths += SOUND_EFFECTS_PATH.glob(f'*{self.resource_manager.OGG_FILETYPE}')
+        for sprites_path in (PLAYER_IMAGE_PATH, ENEMY_PATH, WEAPON_IMAGE_PATH):
+            paths += sprites_path.glob(f'*{self.resource_manager.PNG_FILETYPE}')
+        return paths
+
     def _generate_map(self, x_pos: int = 0, y_pos: int = 0):
         """
         Generates the map with all the relevant data, e.g., items, enemies, triggers, etc.
         """
 
-        self.map = Map(self.map_data_file, self.world.resource_manager)
+        self.map = self.map_cache.get(self.map_data_file)
 
-        for depth, map_layer in self.map.get_map_images():
+        for map_layer in self.map.get_map_layers():
             layer_entity_id = self.world.create_entity()
             self.world.add_component(layer_entity_id, cmp.Position(x=x_pos, y=y_pos))
-            self.world.add_component(layer_entity_id, cmp.Renderable(image=map_layer, depth=depth))
+            self.world.add_component(layer_entity_id, map_layer)
             self.map.layer_entities.append(layer_entity_id)
 
     def _generate_objects(self):
         dialog_font = self.world.resource_manager.get_font(dialog_box.DIALOG_FONT_ID)
+        self.static_colliders.clear()
         for components in self.map.create_colliders():
             ent_id = self.world.create_entity(*components)
             self.map.object_entities.append(ent_id)
+            self.static_colliders.insert(components[0])
+        self.static_tile_colliders.clear()
+        for rect in self.map.get_tile_collider_rects():
+            self.static_tile_colliders.insert(pygame.Rect(rect))
         for components in self.map.create_interactive_objects(dialog_font):
             ent_id = self.world.create_entity(*components)
             self.map.object_entities.append(ent_id)
@@ -338,6 +376,7 @@ class GameplayScene(BaseScene):
 
             # Generate new objects and add the cached processors
             self._generate_objects()
+            self._prefetch_neighbours()
             for proc in self._cached_scene_processors:
                 self.world.add_processor(proc, PROCESSOR_PRIORITY[type(proc)])
             self._cached_scene_processors = []
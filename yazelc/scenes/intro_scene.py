@@ -38,7 +38,7 @@ class IntroScene(BaseScene):
 
     def on_enter(self):
         # load resources
-        pg_logo_surface = self.world.resource_manager.add_texture(PG_LOGO)
+        pg_logo_surface = self.world.resource_manager.add_texture(PG_LOGO).copy()  # The cached texture is shared
         pg_logo_surface.set_alpha(0)
         scale = 0.10
         pg_logo_surface = pygame.transform.smoothscale(pg_logo_surface,
@@ -85,7 +85,7 @@ class IntroScene(BaseScene):
         ]
 
         # Set systems
-        render_sys = RenderSystem(self.window)
+        render_sys = RenderSystem(self.window, dirty_rects=cfg.DIRTY_RECT_RENDERING)
         cutscene_sys = CutsceneSystem(task_list_main, secondary_task_list)
         dialog_sys = DialogMenuSystem()
         self.world.add_processor(render_sys)
@@ -11,4 +11,6 @@ def run_game_loop(initial_scene: BaseScene):
             current_scene.update()
         current_scene.on_exit()
         current_scene.event_manager.remove_all_handlers()  # TODO: Should this part of the scene code?
+        current_scene.resource_manager.release()  # Kept on the cache, the next scene may use them
         current_scene = current_scene.next_scene
+    BaseScene.asset_preloader.shutdown()
@@ -52,7 +52,7 @@ def closing_circle(player_entity_id: int, camera: Camera, world: zesper.World):
         world.process()
         cover_surface.fill(cfg.C_BLACK)
         pygame.draw.circle(cover_surface, cfg.C_WHITE, (position.x - camera.pos.x, position.y - camera.pos.y), radius)
-        world.component_for_entity(effect_id, cmp.Renderable).image = cover_surface
+        renderable.dirty = True
         radius -= 5
         frames_to_exit -= 1
 
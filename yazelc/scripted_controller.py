@@ -0,0 +1,30 @@
+from collections.abc import Iterable, Mapping
+
+from yazelc.controller import Controller, Button
+
+
+class ScriptedController(Controller):
+    """
+    Replays a fixed input script, e.g., for headless runs and benchmarks. The script maps frame numbers to the buttons
+    held down from that frame on, until the next scripted frame
+    """
+
+    def __init__(self, script: Mapping[int, Iterable[Button]] = None):
+        self.script = {frame: frozenset(buttons) for frame, buttons in (script or {}).items()}
+        self.frame = -1
+        self.current_buttons: frozenset[Button] = frozenset()
+        self.previous_buttons: frozenset[Button] = frozenset()
+
+    def process_input(self):
+        self.frame += 1
+        self.previous_buttons = self.current_buttons
+        self.current_buttons = self.script.get(self.frame, self.current_buttons)
+
+    def is_button_down(self, button: Button) -> bool:
+        return button in self.current_buttons
+
+    def is_button_pressed(self, button: Button) -> bool:
+        return button in self.current_buttons and button not in self.previous_buttons
+
+    def is_button_released(self, button: Button) -> bool:
+        return button not in self.current_buttons and button in self.previous_buttons
@@ -43,7 +43,8 @@ class AISystem(zesper.Processor):
         animation_identifier = self.world.resource_manager.get_animation_identifier(enemy_type, state.status, state.direction)
         animation_strip = self.world.resource_manager.get_animation_strip(animation_identifier)
         # TODO: This is hardcoded. Berrry bad! Maybe include the frame information on the animation stripe
-        animation = Animation.from_delay(animation_strip, 10)
+        frame_schedule = self.world.resource_manager.get_frame_schedule(animation_identifier, 10)
+        animation = Animation(animation_strip, frame_schedule)
         self.world.add_component(enemy_decision_event.enemy_id, animation)
         if enemy_type == 'kefer' and state.status == Status.IDLE:
             position = self.world.component_for_entity(enemy_decision_event.enemy_id, Position)
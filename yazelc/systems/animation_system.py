@@ -1,22 +1,76 @@
-from yazelc import zesper
+import heapq
+from itertools import count
 
+from yazelc import zesper
 from yazelc.components import Animation, Renderable
 
 
 class AnimationSystem(zesper.Processor):
+    """
+    Shows on each tick the strip frame that the (shared) frame sequence of the animation assigns to it
+
+    Instead of visiting every animation on every tick, each animation is kept on a queue ordered by the tick of its next
+    frame change, so only the animations whose frame changes on this tick are updated. The queue entries of replaced or
+    removed animations are dropped as they come out
+
+    The start ticks are kept by the system, not on the components, as these count the ticks of this system and the
+    components may be moved to the world of another scene
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.tick = 0
+        self._frame_changes: list[tuple[int, int, int, Animation]] = []  # (tick, insertion order, entity, animation)
+        self._insertion_counter = count()
+        self._animations = None  # Last query result, a new list means animations have been added or removed
+        self._start_ticks: dict[int, tuple[Animation, int]] = {}  # Scheduled animation and its start tick by entity
 
     def process(self):
-        for ent, (animation, renderable) in self.world.get_components(Animation, Renderable):
+        self.tick += 1
+
+        animations = self.world.get_components(Animation, Renderable)
+        if animations is not self._animations:
+            self._animations = animations
+            for ent, (animation, renderable) in animations:
+                if (scheduled := self._start_ticks.get(ent)) is None or scheduled[0] is not animation:
+                    self._start_ticks[ent] = (animation, self.tick)
+                    self._schedule(self.tick, ent, animation)
+
+        while self._frame_changes and self._frame_changes[0][0] <= self.tick:
+            _, _, ent, animation = heapq.heappop(self._frame_changes)
+            if not self.world.entity_exists(ent) or self.world.try_component(ent, Animation) is not animation:
+                self._unschedule(ent, animation)
+                continue
+            if (renderable := self.world.try_component(ent, Renderable)) is None:
+                self._unschedule(ent, animation)  # Restarts once the entity gets a renderable again
+                continue
+            self._show_frame(ent, animation, renderable)
+
+    def _show_frame(self, ent: int, animation: Animation, renderable: Renderable):
+        frame_sequence = animation.frame_sequence
+        elapsed_ticks = self.tick - self._start_ticks[ent][1]
+        if elapsed_ticks >= len(frame_sequence):
+            if animation.one_loop:
+                self._unschedule(ent, animation)
+                self.world.remove_component(ent, Animation)
+                return
+            elapsed_ticks %= len(frame_sequence)
+
+        frame_idx = frame_sequence[elapsed_ticks]
+        image = animation.strip[frame_idx]
+        if renderable.image is not image:
+            renderable.image = image
 
-            if animation.frame_counter >= len(animation.frame_sequence):
-                if animation.one_loop:
-                    self.world.remove_component(ent, Animation)
-                    continue
-                else:
-                    animation.frame_counter = 0
+        # The frame is kept until the sequence moves to another frame or ends (to loop or to finish the animation)
+        next_elapsed_ticks = elapsed_ticks + 1
+        while next_elapsed_ticks < len(frame_sequence) and frame_sequence[next_elapsed_ticks] == frame_idx:
+            next_elapsed_ticks += 1
+        self._schedule(self.tick + next_elapsed_ticks - elapsed_ticks, ent, animation)
 
-            animation.index = animation.frame_sequence[animation.frame_counter]
-            renderable.image = animation.strip[animation.index]
+    def _schedule(self, tick: int, ent: int, animation: Animation):
+        heapq.heappush(self._frame_changes, (tick, next(self._insertion_counter), ent, animation))
 
-            # Advance the animation to the next frame
-            animation.frame_counter += 1
+    def _unschedule(self, ent: int, animation: Animation):
+        """ Forgets the start tick unless the entity got another animation, which is already scheduled """
+        if (scheduled := self._start_ticks.get(ent)) is not None and scheduled[0] is animation:
+            del self._start_ticks[ent]
@@ -1,7 +1,11 @@
+import pygame
+
+from yazelc import config as cfg
 from yazelc import zesper
 from yazelc.components import Position, Velocity, HitBox, InteractorTag, Dialog, Weapon, Health, Collectable, Door
 from yazelc.event.events import CollisionEvent, DamageEvent, CollectionEvent, HitDoorEvent, DialogTriggerEvent
 from yazelc.player.player import VELOCITY
+from yazelc.utils.spatial_grid import SpatialGrid
 
 
 class CollisionSystem(zesper.Processor):
@@ -15,19 +19,36 @@ class CollisionSystem(zesper.Processor):
     The reasoning is that after a "wall" collision entities normally needs a repositioning which can trigger further
     collision with entities which have been already tested negative for collision. This adds a layer of complexity
     as one has to deal with several collision checks
+
+    Impenetrable hitboxes are assumed to be static (map walls) and are looked up on a spatial grid that the owner of
+    the system fills once per map load. Only the walls sharing a grid cell with the moving hitbox are tested.
+
+    The map walls may be merged from the colliders of several tiles. The corner push only applies when a single tile
+    collider is touched, hence these are kept on a second grid, if not given the walls are taken as tile colliders.
     """
 
+    def __init__(self, static_colliders: SpatialGrid = None, static_tile_colliders: SpatialGrid = None):
+        super().__init__()
+        self.static_colliders = static_colliders if static_colliders is not None else SpatialGrid(cfg.TILE_WIDTH)
+        self.static_tile_colliders = static_tile_colliders
+
     def process(self):
 
-        # Resolves collision of all moving hitboxes against impenetrable hitboxes
-        impenetrable_hitboxes = [hitbox for ent, hitbox in self.world.get_component(HitBox) if hitbox.impenetrable]
+        # Resolves collision of all moving hitboxes against the impenetrable hitboxes in their neighbourhood. The queried
+        # area spans the current and the previous hitbox location as the resolution may move the hitbox back
         for ent, (hitbox, position, velocity) in self.world.get_components(HitBox, Position, Velocity):
+            delta_x = round(position.x) - round(position.prev_x)
+            delta_y = round(position.y) - round(position.prev_y)
+            query_rect = pygame.Rect(hitbox).union(hitbox.x - delta_x, hitbox.y - delta_y, hitbox.w, hitbox.h)
+            impenetrable_hitboxes = self.static_colliders.query(query_rect)
+            if not impenetrable_hitboxes:
+                continue
+
             colliding_hitboxes_indices = hitbox.collidelistall(impenetrable_hitboxes)
             if colliding_hitboxes_indices:
 
-                if hitbox.skin_depth and len(colliding_hitboxes_indices) == 1:
-                    colliding_wall = impenetrable_hitboxes[colliding_hitboxes_indices[0]]
-                    self._handle_corner_push(position, velocity, hitbox, colliding_wall, impenetrable_hitboxes)
+                if hitbox.skin_depth and len(colliding_tiles := self._get_colliding_tiles(hitbox, query_rect)) == 1:
+                    self._handle_corner_push(position, velocity, hitbox, colliding_tiles[0], impenetrable_hitboxes)
                 elif hitbox.destroy_on_contact:
                     self.world.delete_entity(ent)
                 else:
@@ -35,11 +56,8 @@ class CollisionSystem(zesper.Processor):
 
         # Everything that it is penetrable it is checked for collision after the movement checks have been resolved
         transparent_hitboxes = [(ent, hb) for ent, hb in self.world.get_component(HitBox) if not hb.impenetrable]
-        for index, (ent_1, hitbox_1) in enumerate(transparent_hitboxes):
-            rect_dictionary = {ent: hb for ent, hb in transparent_hitboxes[index + 1:]}  # prevents double counting and self checking
-            entities_that_collided = hitbox_1.collidedictall(rect_dictionary, 1)
-            for ent_2, _ in entities_that_collided:
-                self.world.event_queue.add(CollisionEvent(ent_1, ent_2))
+        for index_1, index_2 in self._overlapping_pairs([hitbox for _, hitbox in transparent_hitboxes]):
+            self.world.event_queue.add(CollisionEvent(transparent_hitboxes[index_1][0], transparent_hitboxes[index_2][0]))
 
     def on_collision(self, collision_event: CollisionEvent):
 
@@ -61,6 +79,12 @@ class CollisionSystem(zesper.Processor):
             hit_door_event = HitDoorEvent(door_entity_id, transversing_entity_id)
             self.world.event_queue.add(hit_door_event)
 
+    def _get_colliding_tiles(self, hitbox: HitBox, query_rect: pygame.Rect) -> list[pygame.Rect]:
+        """ Tile colliders, i.e., not merged, overlapping the hitbox """
+        grid = self.static_tile_colliders if self.static_tile_colliders is not None else self.static_colliders
+        tile_colliders = grid.query(query_rect)
+        return [tile_colliders[idx] for idx in hitbox.collidelistall(tile_colliders)]
+
     def _handle_corner_push(self, position: Position, velocity: Velocity, hitbox: HitBox, colliding_wall: HitBox,
                             impenetrable_hitboxes: list[HitBox]):
         """
@@ -98,6 +122,29 @@ class CollisionSystem(zesper.Processor):
                     correction_vel = Velocity(0, VELOCITY)
             self._update_entity_position(position, correction_vel, hitbox)
 
+    @staticmethod
+    def _overlapping_pairs(hitboxes: list[HitBox]) -> list[tuple[int, int]]:
+        """
+        Sort and sweep along the x-axis. Returns the index pairs (i, j), with i < j, of the colliding hitboxes in no
+        particular order, i.e., the same set of pairs that a brute force double loop over the input list finds
+        """
+        pairs = []
+        active = []  # indices of the hitboxes whose horizontal extent may still overlap the ones swept next
+        for index in sorted(range(len(hitboxes)), key=lambda idx: hitboxes[idx].left):
+            hitbox = hitboxes[index]
+            n_active = 0
+            for other_index in active:
+                other_hitbox = hitboxes[other_index]
+                if other_hitbox.right <= hitbox.left:  # Already swept past, hence dropped from the active ones
+                    continue
+                active[n_active] = other_index
+                n_active += 1
+                if hitbox.colliderect(other_hitbox):
+                    pairs.append((other_index, index) if other_index < index else (index, other_index))
+            del active[n_active:]
+            active.append(index)
+        return pairs
+
     @staticmethod
     def _update_entity_position(position: Position, velocity: Velocity, hitbox: HitBox):
         """ exact copy of the method in the movement system """
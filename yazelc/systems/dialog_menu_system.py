@@ -40,6 +40,7 @@ class DialogMenuSystem(zesper.Processor):
 
             char_to_render = dialog.next_char()
             dialog.font.render_text_at(char_to_render, background, dialog.x_pos, dialog.y_pos)
+            renderable_cmp.dirty = True
             dialog.x_pos += dialog.font.space_width
             dialog.index += 1
             dialog.frame_tick = 0
@@ -63,6 +64,7 @@ class DialogMenuSystem(zesper.Processor):
                     dialog_.idle = False
                     surface = renderable_.image
                     surface.fill(cfg.C_BLACK)
+                    renderable_.dirty = True
                     self.world.event_queue.add(SoundTriggerEvent(self.TEXT_SCROLL_SOUND_ID))
 
         # Handle Menus. TODO: Should we have a separate system to handle these??
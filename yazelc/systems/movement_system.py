@@ -8,16 +8,31 @@ class MovementSystem(zesper.Processor):
         """
         Moves all entities with positions. If it has a Hitbox component then updates their internal position as well.
         For accelerated entities it limits their minimal velocity.
+
+        The entities with a hitbox are moved and synced in a single pass over the (cached) hitbox query. The ones
+        without, i.e., the map layers scrolled on a transition, are rare and only then looked up on a second pass
         """
 
         for ent, (velocity, acceleration) in self.world.get_components(Velocity, Acceleration):
             velocity.x = max(velocity.x + acceleration.x, Velocity.ZERO_THRESHOLD)
             velocity.y = max(velocity.y + acceleration.x, Velocity.ZERO_THRESHOLD)
 
-        for ent, (velocity, position) in self.world.get_components(Velocity, Position):
-            position.move_ip(velocity.x, velocity.y)
+        hitbox_movers = self.world.get_components(Velocity, Position, HitBox)
+        for ent, (velocity, position, hitbox) in hitbox_movers:
+            position.prev_x = position.x
+            position.prev_y = position.y
+            position += velocity
+            # Slow entities often stay on the same pixel, then their hitbox (and its corner rects) is left untouched
+            delta_x = round(position.x) - round(position.prev_x)
+            delta_y = round(position.y) - round(position.prev_y)
+            if delta_x or delta_y:
+                hitbox.move_ip(delta_x, delta_y)
 
-            if hitbox := self.world.try_component(ent, HitBox):
-                hitbox.move_ip(round(position.x) - round(position.prev_x), round(position.y) - round(position.prev_y))
+        if len(movers := self.world.get_components(Velocity, Position)) != len(hitbox_movers):
+            for ent, (velocity, position) in movers:
+                if not self.world.has_component(ent, HitBox):
+                    position.prev_x = position.x
+                    position.prev_y = position.y
+                    position += velocity
 
         # TODO: Make a limit here for movement outside the world bounds
@@ -1,60 +1,194 @@
+from collections.abc import Iterator
+from typing import Optional, Union
+from weakref import WeakKeyDictionary
+
 import pygame
+import pygame.freetype
 
 from yazelc import components as cmp
 from yazelc import config as cfg
 from yazelc import zesper
 from yazelc.camera import Camera
+from yazelc.utils.profiler import Profiler
 
 
 class RenderSystem(zesper.Processor):
-    def __init__(self, window: pygame.Surface, camera: Camera = None):
+    """
+    Draws all renderables ordered by depth and the particles on top of them.
+
+    On the dirty rectangles mode the window is not cleared between frames. Only the regions covered, on the previous
+    or on the current frame, by renderables that have moved, swapped or modified (flagged as dirty) their image, or
+    that have been added or removed are redrawn and pushed to the display.
+    """
+    MAX_DIRTY_REGIONS = 32  # Above this number of regions the whole window gets updated
+    BLEND_COLORS = (cfg.C_LIGHT_RED, cfg.C_LIGHT_BLUE)
+    PROFILER_FONT_SIZE = 8
+    PROFILER_BACKGROUND = pygame.Color(0, 0, 0, 160)
+
+    def __init__(self, window: pygame.Surface, camera: Camera = None, dirty_rects: bool = False):
         super().__init__()
         self.camera = camera if camera else Camera(0, 0)
         self.window = window
+        self.dirty_rects = dirty_rects
+        self._previous_frame: Optional[dict[int, tuple]] = None  # Drawn (image, screen rect, depth) per entity
+        # Tinted variants per source image and color, dropped together with the source image
+        self._tint_cache: WeakKeyDictionary[pygame.Surface, dict[tuple, pygame.Surface]] = WeakKeyDictionary()
+        self._profiler_font: Optional[pygame.freetype.Font] = None
 
     def process(self):
-        self.window.fill(cfg.C_BLACK)
-
-        # Render sprites
         camera_pos = self.camera.pos
-        for ent, (rend, pos) in sorted(self.world.get_components(cmp.Renderable, cmp.Position), key=lambda x: x[1][0].depth, reverse=False):
+
+        if self.dirty_rects and not cfg.DEBUG_MODE:
+            regions = self._get_dirty_regions(camera_pos)
+            if regions:
+                self._draw(camera_pos, regions)
+                pygame.display.update(regions)
+        else:
+            self._previous_frame = None
+            self._draw(camera_pos)
+            pygame.display.flip()
+
+        for ent, blend in self.world.get_component(cmp.BlendEffect):
+            blend.timer.tick()
+            if blend.timer.has_finished():
+                self.world.remove_component(ent, cmp.BlendEffect)
+                if renderable := self.world.try_component(ent, cmp.Renderable):
+                    renderable.dirty = True  # Back to the untinted image
+
+    def _iter_renderables(self) -> Iterator[tuple[int, Union[cmp.Renderable, cmp.ChunkedRenderable], cmp.Position]]:
+        """ Iterates over the renderables that have a position, already ordered by depth, from the world's render queue """
+        for ent, rend in self.world.render_queue:
+            if (pos := self.world.try_component(ent, cmp.Position)) is not None:  # Vectors at (0, 0) are falsy
+                yield ent, rend, pos
+
+    def _draw(self, camera_pos: pygame.Vector2, regions: list[pygame.Rect] = None):
+        """ Draws everything on the window or, if given, only within the regions """
+        blit_sequence = []
+        for ent, rend, pos in self._iter_renderables():
 
             if pos.absolute:
                 screen_pos = pos
             else:
                 screen_pos = pos - camera_pos
 
+            if isinstance(rend, cmp.ChunkedRenderable):  # Only the chunks inside the window are drawn
+                view = pygame.Rect(-round(screen_pos.x), -round(screen_pos.y), cfg.RESOLUTION.x, cfg.RESOLUTION.y)
+                for (chunk_x, chunk_y), chunk in rend.visible_chunks(view):
+                    blit_sequence.append((chunk, (chunk_x - view.x, chunk_y - view.y)))
+                continue
+
             if blend := self.world.try_component(ent, cmp.BlendEffect):
-                new_image = rend.image.copy()
-                block = pygame.Surface(rend.image.get_size()).convert_alpha()
-                if blend.timer.module(blend.blink_interval):
-                    color = cfg.C_LIGHT_RED
-                else:
-                    color = cfg.C_LIGHT_BLUE
-                block.fill(color)
-                new_image.blit(block, (0, 0), special_flags=pygame.BLEND_RGBA_MIN)
-                new_image.blit(new_image, (0, 0), special_flags=pygame.BLEND_RGBA_ADD)
-
-                blend.timer.tick()
-                if blend.timer.has_finished():
-                    self.world.remove_component(ent, cmp.BlendEffect)
-
-                img = new_image
+                color = self.BLEND_COLORS[0] if blend.timer.module(blend.blink_interval) else self.BLEND_COLORS[1]
+                img = self._get_tinted_image(rend.image, color)
             else:
                 img = rend.image
 
-            self.window.blit(img, (round(screen_pos.x), round(screen_pos.y)))
+            blit_sequence.append((img, (round(screen_pos.x), round(screen_pos.y))))
 
-        # TODO: They can be on the the same loop if the position has the absolute flag on
-        # Render native shapes which are (normally) associated with particle effects
-        for ent, (vfx, pos) in self.world.get_components(cmp.Particle, cmp.Position):
-            rect = pygame.Rect(round(pos.x - camera_pos.x), round(pos.y - camera_pos.y), 1, 1)
-            pygame.draw.rect(self.window, vfx.color, rect)
+        # Particles are drawn on top of everything as one pixel blits
+        for ent, emitter in self.world.get_component(cmp.ParticleEmitter):
+            blit_sequence.extend((emitter.dot, dot_pos) for dot_pos in self._get_particle_positions(emitter, camera_pos))
+
+        # The regions may overlap, therefore each one is cleared and redrawn from scratch
+        for region in regions if regions is not None else [None]:
+            self.window.set_clip(region)
+            self.window.fill(cfg.C_BLACK)
+            self.window.blits(blit_sequence, doreturn=False)
+        self.window.set_clip(None)
 
         if cfg.DEBUG_MODE:  # On debug mode then render all hitboxes
             for ent, (hitbox) in self.world.get_component(cmp.HitBox):
                 hb_surface = pygame.Surface((hitbox.w, hitbox.h), flags=pygame.SRCALPHA)
                 hb_surface.fill(cfg.C_TRANSPARENT_BLUE)
                 self.window.blit(hb_surface, (hitbox.x - round(camera_pos.x), hitbox.y - round(camera_pos.y)))
+            if self.world.profiler:
+                self._draw_profiler_overlay(self.world.profiler)
+
+    def _draw_profiler_overlay(self, profiler: Profiler):
+        """ Rolling min, mean and p99 times in ms of each profiled section, the ones over the frame budget in red """
+        if self._profiler_font is None:
+            self._profiler_font = pygame.freetype.Font(None, self.PROFILER_FONT_SIZE)
+        line_height = self._profiler_font.get_sized_height()
+        names = sorted(profiler.names(), key=lambda name: name != profiler.FRAME_SECTION)
+        lines = [('', 'min', 'mean', 'p99', cfg.C_WHITE)]
+        for name in names:
+            stats = profiler.stats(name)
+            color = cfg.C_LIGHT_RED if stats.p99 > cfg.FRAME_BUDGET else cfg.C_WHITE
+            lines.append((name, f'{stats.min * 1e3:.2f}', f'{stats.mean * 1e3:.2f}', f'{stats.p99 * 1e3:.2f}', color))
+
+        overlay = pygame.Surface((cfg.RESOLUTION.x, line_height * len(lines) + 2), flags=pygame.SRCALPHA)
+        overlay.fill(self.PROFILER_BACKGROUND)
+        for idx, (name, *columns, color) in enumerate(lines):
+            pos_y = idx * line_height + 1
+            self._profiler_font.render_to(overlay, (2, pos_y), name, color)
+            for column_idx, text in enumerate(columns):
+                self._profiler_font.render_to(overlay, (cfg.RESOLUTION.x - 40 * (len(columns) - column_idx), pos_y), text, color)
+        self.window.blit(overlay, (0, 0))
+
+    @staticmethod
+    def _get_particle_positions(emitter: cmp.ParticleEmitter, camera_pos: pygame.Vector2) -> list[tuple[int, int]]:
+        return [(round(x - camera_pos.x), round(y - camera_pos.y)) for x, y in zip(emitter.x, emitter.y)]
+
+    def _get_tinted_image(self, image: pygame.Surface, color: pygame.Color) -> pygame.Surface:
+        """ Returns the cached tinted image, on the first request all the blend color variants are computed at once """
+        tinted_images = self._tint_cache.get(image)
+        if tinted_images is None:
+            tinted_images = {tuple(blend_color): self._tint(image, blend_color) for blend_color in self.BLEND_COLORS}
+            self._tint_cache[image] = tinted_images
+        key = tuple(color)
+        if key not in tinted_images:
+            tinted_images[key] = self._tint(image, color)
+        return tinted_images[key]
+
+    @staticmethod
+    def _tint(image: pygame.Surface, color: pygame.Color) -> pygame.Surface:
+        tinted_image = image.copy()
+        tinted_image.fill(color, special_flags=pygame.BLEND_RGBA_MIN)
+        tinted_image.blit(tinted_image, (0, 0), special_flags=pygame.BLEND_RGBA_ADD)
+        return tinted_image
+
+    def _get_dirty_regions(self, camera_pos: pygame.Vector2) -> list[pygame.Rect]:
+        """
+        Compares what is about to be drawn with what was drawn on the previous frame and returns the window regions to
+        be redrawn. On the first frame the whole window is returned
+        """
+        window_rect = self.window.get_rect()
+        frame = {}
+        regions = []
+        for ent, rend, pos in self._iter_renderables():
+            screen_pos = pos if pos.absolute else pos - camera_pos
+            if isinstance(rend, cmp.ChunkedRenderable):
+                screen_rect = pygame.Rect(round(screen_pos.x), round(screen_pos.y), rend.width, rend.height)
+                frame[ent] = (rend, screen_rect, rend.depth)
+                continue
+            screen_rect = rend.image.get_rect(topleft=(round(screen_pos.x), round(screen_pos.y)))
+            frame[ent] = (rend.image, screen_rect, rend.depth)
+            if rend.dirty or self.world.has_component(ent, cmp.BlendEffect):
+                rend.dirty = False
+                regions.append(screen_rect)
+        for ent, emitter in self.world.get_component(cmp.ParticleEmitter):
+            if dot_positions := self._get_particle_positions(emitter, camera_pos):
+                xs, ys = zip(*dot_positions)
+                bounding_rect = pygame.Rect(min(xs), min(ys), max(xs) - min(xs) + 1, max(ys) - min(ys) + 1)
+                frame[ent] = (tuple(dot_positions), bounding_rect, None)
+
+        previous_frame = self._previous_frame
+        self._previous_frame = frame
+        if previous_frame is None:
+            return [window_rect]
+
+        for ent, drawn in frame.items():
+            previous_drawn = previous_frame.get(ent)
+            if previous_drawn != drawn:
+                regions.append(drawn[1])
+                if previous_drawn is not None:
+                    regions.append(previous_drawn[1])
+        for ent, previous_drawn in previous_frame.items():
+            if ent not in frame:
+                regions.append(previous_drawn[1])
 
-        pygame.display.flip()
+        regions = [region.clip(window_rect) for region in regions]
+        regions = [region for region in regions if region.width and region.height]
+        if len(regions) > self.MAX_DIRTY_REGIONS:
+            return [window_rect]
+        return regions
@@ -1,8 +1,6 @@
-from math import isclose
-
 from yazelc import visual_effects as vfx
 from yazelc import zesper
-from yazelc.components import Particle, Position, Velocity
+from yazelc.components import ParticleEmitter
 from yazelc.event.events import ExplosionEvent
 
 
@@ -12,12 +10,31 @@ class VisualEffectsSystem(zesper.Processor):
     FRICTION = 0.75
 
     def process(self):
-        # Particle effects
-        for ent, (_, pos, vel) in self.world.get_components(Particle, Position, Velocity):
-            vel.x = vel.x * self.FRICTION
-            vel.y = vel.y * self.FRICTION
-            if isclose(vel.x, 0, abs_tol=self.ABS_TOL) and isclose(vel.y, 0, abs_tol=self.ABS_TOL):
+        # Particle effects, the emitters move their particles on their own as a batch
+        for ent, emitter in self.world.get_component(ParticleEmitter):
+            if not self._move_particles(emitter):
                 self.world.delete_entity(ent)
 
+    def _move_particles(self, emitter: ParticleEmitter) -> int:
+        """
+        Moves and slows down the particles of the emitter, updating its arrays in place. The particles stopped on the
+        previous frame have already been drawn on their last position, hence are dropped. Returns the particles left
+        """
+        pos_x, pos_y, vel_x, vel_y = emitter.x, emitter.y, emitter.vel_x, emitter.vel_y
+        n_kept = 0
+        for idx in range(len(pos_x)):
+            particle_vel_x = vel_x[idx]
+            particle_vel_y = vel_y[idx]
+            if emitter.has_moved and abs(particle_vel_x) <= self.ABS_TOL and abs(particle_vel_y) <= self.ABS_TOL:
+                continue
+            pos_x[n_kept] = pos_x[idx] + particle_vel_x
+            pos_y[n_kept] = pos_y[idx] + particle_vel_y
+            vel_x[n_kept] = particle_vel_x * self.FRICTION
+            vel_y[n_kept] = particle_vel_y * self.FRICTION
+            n_kept += 1
+        del pos_x[n_kept:], pos_y[n_kept:], vel_x[n_kept:], vel_y[n_kept:]
+        emitter.has_moved = True
+        return n_kept
+
     def on_explosion(self, explosion: ExplosionEvent):
         vfx.create_explosion(explosion.position, explosion.n_particles, explosion.max_vel, explosion.color, self.world)
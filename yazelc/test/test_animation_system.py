@@ -0,0 +1,74 @@
+import unittest
+
+import pygame
+
+from yazelc import components as cmp
+from yazelc import zesper
+from yazelc.event.event_queue import EventQueue
+from yazelc.resource_manager import ResourceManager
+from yazelc.systems.animation_system import AnimationSystem
+
+FRAME_SEQUENCE = (0, 0, 0, 1, 1, 1)
+
+
+class TestAnimationSystem(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.strip = [pygame.Surface((1, 1)), pygame.Surface((1, 1))]
+
+    @staticmethod
+    def create_world() -> zesper.World:
+        world = zesper.World(ResourceManager(), EventQueue())
+        world.add_processor(AnimationSystem())
+        return world
+
+    @staticmethod
+    def shown_images(world: zesper.World, renderable: cmp.Renderable, n_ticks: int) -> list[pygame.Surface]:
+        images = []
+        for _ in range(n_ticks):
+            world.process()
+            images.append(renderable.image)
+        return images
+
+    def test_loop(self):
+        world = self.create_world()
+        renderable = cmp.Renderable(self.strip[0])
+        world.create_entity(cmp.Animation(self.strip, FRAME_SEQUENCE), renderable)
+        expected = [self.strip[frame_idx] for frame_idx in FRAME_SEQUENCE * 2]
+        self.assertEqual(self.shown_images(world, renderable, len(expected)), expected)
+
+    def test_replaced_animation_restarts(self):
+        world = self.create_world()
+        renderable = cmp.Renderable(self.strip[0])
+        ent = world.create_entity(cmp.Animation(self.strip, FRAME_SEQUENCE), renderable)
+        self.shown_images(world, renderable, 4)
+        world.add_component(ent, cmp.Animation(self.strip[::-1], FRAME_SEQUENCE))
+        self.assertEqual(self.shown_images(world, renderable, 4), [self.strip[1]] * 3 + [self.strip[0]])
+
+    def test_restarts_with_renderable(self):
+        world = self.create_world()
+        renderable = cmp.Renderable(self.strip[0])
+        ent = world.create_entity(cmp.Animation(self.strip, FRAME_SEQUENCE), renderable)
+        self.shown_images(world, renderable, 4)
+        world.remove_component(ent, cmp.Renderable)
+        for _ in range(len(FRAME_SEQUENCE)):
+            world.process()
+        world.add_component(ent, renderable)
+        self.assertEqual(self.shown_images(world, renderable, 4), [self.strip[0]] * 3 + [self.strip[1]])
+
+    def test_move_to_another_world(self):
+        """ As the player components going through a door to another world, i.e., scene """
+        world = self.create_world()
+        ent = world.create_entity(cmp.Animation(self.strip, FRAME_SEQUENCE), cmp.Renderable(self.strip[0]))
+        for _ in range(201):
+            world.process()
+
+        other_world = self.create_world()
+        other_ent = other_world.create_entity(*world.components_for_entity(ent))
+        renderable = other_world.component_for_entity(other_ent, cmp.Renderable)
+        expected = [self.strip[frame_idx] for frame_idx in FRAME_SEQUENCE * 2]
+        self.assertEqual(self.shown_images(other_world, renderable, len(expected)), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
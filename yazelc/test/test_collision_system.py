@@ -0,0 +1,56 @@
+import random
+import unittest
+
+import pygame
+
+from yazelc import components as cmp
+from yazelc import zesper
+from yazelc.event.event_queue import EventQueue
+from yazelc.map import Map
+from yazelc.player import player
+from yazelc.resource_manager import ResourceManager
+from yazelc.systems.collision_system import CollisionSystem
+from yazelc.systems.movement_system import MovementSystem
+from yazelc.utils.spatial_grid import SpatialGrid
+
+# A wall and a thin post next to it. The player going up grazes the wall corner only where both touch
+TILE_COLLIDERS = [(0, 0, 16, 16), (16, 0, 2, 16)]
+
+
+class TestCollisionSystem(unittest.TestCase):
+
+    def slide_along(self, walls: list[tuple[int, int, int, int]], n_frames: int = 8) -> list[tuple[float, float]]:
+        """ Positions of the player going up against the walls, which are merged from the tile colliders """
+        world = zesper.World(ResourceManager(), EventQueue())
+        static_colliders = SpatialGrid(16, [cmp.HitBox(*wall, impenetrable=True) for wall in walls])
+        static_tile_colliders = SpatialGrid(16, [pygame.Rect(rect) for rect in TILE_COLLIDERS])
+        world.add_processor(MovementSystem(), priority=2)
+        world.add_processor(CollisionSystem(static_colliders, static_tile_colliders), priority=1)
+        position = cmp.Position(15, 18)
+        hitbox = cmp.HitBox(15, 18, player.HITBOX_WIDTH, player.HITBOX_HEIGHT, skin_depth=player.SKIN_DEPTH)
+        world.create_entity(position, hitbox, cmp.Velocity(0, -player.VELOCITY))
+        positions = []
+        for _ in range(n_frames):
+            world.process()
+            positions.append((position.x, position.y))
+        return positions
+
+    def test_corner_push_on_merged_wall(self):
+        merged_walls = Map._merge_collider_rects(TILE_COLLIDERS)
+        self.assertEqual(merged_walls, [(0, 0, 18, 16)])
+        self.assertEqual(self.slide_along(merged_walls), self.slide_along(TILE_COLLIDERS))
+
+    def test_overlapping_pairs_as_brute_force(self):
+        rng = random.Random(0)
+        for _ in range(20):
+            hitboxes = [cmp.HitBox(rng.randint(0, 64), rng.randint(0, 64), rng.randint(0, 24), rng.randint(0, 24))
+                        for _ in range(rng.randint(0, 40))]
+            expected = {(idx_1, idx_2) for idx_1, hitbox in enumerate(hitboxes) for idx_2 in range(idx_1 + 1, len(hitboxes))
+                        if hitbox.colliderect(hitboxes[idx_2])}
+            pairs = CollisionSystem._overlapping_pairs(hitboxes)
+            self.assertEqual(len(pairs), len(expected))
+            self.assertEqual(set(pairs), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import gc
+import unittest
+from dataclasses import dataclass
+
+from yazelc.event.event_manager import EventManager
+
+
+@dataclass
+class PauseEvent:
+    pass
+
+
+class PauseHandler:
+    def __init__(self, received: list):
+        self.received = received
+
+    def on_pause(self, event: PauseEvent):
+        self.received.append(event)
+
+
+class TestEventManager(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.event_manager = EventManager()
+        self.received = []
+
+    def test_dispatch(self):
+        handler = PauseHandler(self.received)
+        self.event_manager.subscribe_handler(handler)
+        self.event_manager.dispatch_event(PauseEvent())
+        self.event_manager.dispatch_event(PauseEvent())
+        self.assertEqual(len(self.received), 2)
+
+    def test_collected_handler_after_dispatch(self):
+        """ The handlers resolved on a dispatch must not keep alive the ones not referenced anywhere else """
+        handler = PauseHandler(self.received)
+        self.event_manager.subscribe_handler(handler)
+        self.event_manager.dispatch_event(PauseEvent())
+        del handler
+        gc.collect()
+        self.event_manager.dispatch_event(PauseEvent())
+        self.assertEqual(len(self.received), 1)
+        self.assertFalse(self.event_manager.subscribers)
+
+
+if __name__ == '__main__':
+    unittest.main()
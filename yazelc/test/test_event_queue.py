@@ -0,0 +1,62 @@
+import unittest
+from dataclasses import dataclass
+
+from yazelc.event.event_queue import EventQueue, Coalescing
+
+
+@dataclass(frozen=True)
+class MockSoundEvent:
+    id_str: str
+
+
+@dataclass(frozen=True)
+class MockHudEvent:
+    value: int
+
+
+class TestEventQueue(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.event_queue = EventQueue()
+
+    def process_frame(self) -> list:
+        self.event_queue.process_delayed_events()
+        events = []
+        while self.event_queue:
+            events.append(self.event_queue.popleft())
+        return events
+
+    def test_delayed_events_fire_in_order(self):
+        self.event_queue.add('late', 2)
+        self.event_queue.add('early', 1)
+        self.event_queue.add('late_again', 2)
+        self.assertEqual(self.process_frame(), ['early'])
+        self.assertEqual(self.process_frame(), ['late', 'late_again'])
+        self.assertEqual(self.process_frame(), [])
+
+    def test_same_event_instance_twice(self):
+        event = ('frozen', 1)
+        self.event_queue.add(event, 1)
+        self.event_queue.add(event, 1)
+        self.assertEqual(self.process_frame(), [event, event])
+
+    def test_cancel(self):
+        handle = self.event_queue.add('cancelled', 1)
+        self.event_queue.add('kept', 1)
+        self.assertTrue(self.event_queue.cancel(handle))
+        self.assertFalse(self.event_queue.cancel(handle))
+        self.assertEqual(self.process_frame(), ['kept'])
+
+    def test_coalescing(self):
+        self.event_queue.coalescing = {MockSoundEvent: Coalescing.UNIQUE, MockHudEvent: Coalescing.LAST_WINS}
+        for event in [MockSoundEvent('hit'), MockHudEvent(3), MockSoundEvent('hit'), MockHudEvent(2),
+                      MockSoundEvent('door')]:
+            self.event_queue.add(event)
+        self.assertEqual(self.process_frame(), [MockSoundEvent('hit'), MockHudEvent(2), MockSoundEvent('door')])
+
+        self.event_queue.add(MockSoundEvent('hit'))  # It is a new frame
+        self.assertEqual(self.process_frame(), [MockSoundEvent('hit')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -27,6 +27,12 @@ class TestHitboxComponent(unittest.TestCase):
         self.assertTrue(self.hitbox.corner_rects[1].width == 3)
         self.assertTrue(self.hitbox.corner_rects[1].height == 5)
 
+    def test_corner_rects_follow_the_hitbox(self):
+        self.hitbox.move_ip(3, 1)
+        self.hitbox.x = 10
+        self.assertEqual([corner.topleft for corner in self.hitbox.corner_rects], [(10, 3), (10, 7), (14, 7), (14, 3)])
+        self.assertIn((14, 8), self.hitbox.corner_points)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,207 @@
+import base64
+import gzip
+import json
+import os
+import struct
+import tempfile
+import unittest
+import zlib
+from pathlib import Path
+
+from yazelc.map import WorldMap, load_map_data
+from yazelc.map_data import MapDataCache, ObjectLayerData, TileFlags, TileLayerData
+from yazelc.tools import compile_world
+
+TSX = """<?xml version="1.0" encoding="UTF-8"?>
+<tileset name="test" tilewidth="16" tileheight="16" tilecount="8" columns="4">
+ <image source="../images/test.png" width="64" height="32"/>
+ <tile id="5">
+  <objectgroup>
+   <object id="1" x="0" y="4" width="16" height="12"/>
+  </objectgroup>
+ </tile>
+</tileset>
+"""
+
+TMX = """<?xml version="1.0" encoding="UTF-8"?>
+<map orientation="orthogonal" width="3" height="2" tilewidth="16" tileheight="16">
+ <tileset firstgid="1" source="../tilesets/test.tsx"/>
+ <objectgroup name="doors">
+  <object id="1" x="8" y="32" width="16" height="16" gid="6">
+   <properties>
+    <property name="target_x" type="int" value="3"/>
+    <property name="target_door" value="world:map.tmx"/>
+   </properties>
+  </object>
+ </objectgroup>
+ <layer name="ground" width="3" height="2">
+  <data encoding="csv">
+1,2,0,
+6,2147483650,0
+</data>
+ </layer>
+</map>
+"""
+
+TEMPLATE = """<?xml version="1.0" encoding="UTF-8"?>
+<template>
+ <tileset firstgid="1" source="../tilesets/test.tsx"/>
+ <object gid="6" width="16" height="16">
+  <properties>
+   <property name="text" value="template text"/>
+   <property name="item" value="BOMB"/>
+  </properties>
+ </object>
+</template>
+"""
+
+TEMPLATE_TMX = """<?xml version="1.0" encoding="UTF-8"?>
+<map orientation="orthogonal" width="1" height="1" tilewidth="16" tileheight="16">
+ <tileset firstgid="1" tilewidth="16" tileheight="16" tilecount="2" columns="2">
+  <image source="../images/other.png" width="32" height="16"/>
+ </tileset>
+ <tileset firstgid="3" source="../tilesets/test.tsx"/>
+ <objectgroup name="interactive">
+  <object id="4" template="../templates/sign.tx" x="32" y="48">
+   <properties>
+    <property name="text" value="object text"/>
+   </properties>
+  </object>
+ </objectgroup>
+</map>
+"""
+
+ENCODED_LAYER_TMX = """<?xml version="1.0" encoding="UTF-8"?>
+<map orientation="orthogonal" width="3" height="2" tilewidth="16" tileheight="16">
+ <layer name="ground" width="3" height="2">
+  <data {attributes}>{data}</data>
+ </layer>
+</map>
+"""
+
+WORLD = """{"maps": [{"fileName": "test.tmx", "height": 32, "width": 48, "x": 0, "y": 0}], "type": "world"}"""
+
+
+class TestMapData(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        root = Path(self.temp_dir.name)
+        (root / 'tilesets').mkdir()
+        (root / 'maps').mkdir()
+        (root / 'tilesets' / 'test.tsx').write_text(TSX)
+        self.map_path = root / 'maps' / 'test.tmx'
+        self.map_path.write_text(TMX)
+        self.cache = MapDataCache()
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def test_parse(self):
+        map_data = self.cache.load(self.map_path)
+        self.assertEqual(map_data.layer_names, ['ground', 'doors'])  # Tile layers first as in pytmx
+        ground = map_data.get_layer_by_name('ground')
+        self.assertIsInstance(ground, TileLayerData)
+        self.assertEqual(list(ground.gids), [1, 2, 0, 6, 2147483650, 0])
+
+        tileset, rect, flags = map_data.get_tile(6)
+        self.assertEqual(tileset.image_path, os.path.join(self.map_path.parent, '../tilesets', '../images/test.png'))
+        self.assertEqual(rect, (16, 16, 16, 16))
+        self.assertEqual(map_data.get_tile(2147483650)[2], TileFlags(True, False, False))
+        self.assertIsNone(map_data.get_tile(9))
+        self.assertEqual(map_data.get_tile_collider(6), (0, 4, 16, 12))
+
+        doors = map_data.get_layer_by_name('doors')
+        self.assertIsInstance(doors, ObjectLayerData)
+        door = doors.objects[0]
+        self.assertEqual((door.x, door.y), (8, 16))  # Tile objects have their origin at the bottom
+        self.assertEqual(door.properties, {'target_x': 3, 'target_door': 'world:map.tmx'})
+
+    def test_cache(self):
+        map_data = self.cache.load(self.map_path)
+        self.assertIs(self.cache.load(self.map_path), map_data)
+        self.assertTrue(self.map_path.with_suffix(MapDataCache.DISK_CACHE_SUFFIX).exists())
+        self.assertEqual(MapDataCache().load(self.map_path), map_data)  # From the disk cache
+
+        os.utime(self.map_path, (0, 0))
+        self.assertIsNot(self.cache.load(self.map_path), map_data)
+
+    def test_disk_cache_is_json(self):
+        map_data = self.cache.load(self.map_path)
+        cache_path = self.map_path.with_suffix(MapDataCache.DISK_CACHE_SUFFIX)
+        entry = json.loads(cache_path.read_text())
+        self.assertEqual(entry['map']['layers'][0]['gids'], [1, 2, 0, 6, 2147483650, 0])
+
+        entry['map']['layers'][0]['unknown_field'] = 0  # Not the expected schema, hence parsed again
+        cache_path.write_text(json.dumps(entry))
+        self.assertEqual(MapDataCache().load(self.map_path), map_data)
+
+    def test_encodings(self):
+        gids = [1, 2, 0, 6, 2147483650, 0]
+        data = struct.pack('<6I', *gids)
+        for attributes, encoded_data in (('encoding="base64"', data),
+                                         ('encoding="base64" compression="zlib"', zlib.compress(data)),
+                                         ('encoding="base64" compression="gzip"', gzip.compress(data))):
+            self.map_path.write_text(ENCODED_LAYER_TMX.format(attributes=attributes,
+                                                              data=base64.b64encode(encoded_data).decode()))
+            map_data = MapDataCache(persist=False).load(self.map_path)
+            self.assertEqual(list(map_data.get_layer_by_name('ground').gids), gids)
+
+        self.map_path.write_text(ENCODED_LAYER_TMX.format(attributes='encoding="base64" compression="zstd"', data=''))
+        with self.assertRaises(ValueError):
+            MapDataCache(persist=False).load(self.map_path)
+
+    def test_template(self):
+        (self.map_path.parent.parent / 'templates').mkdir()
+        (self.map_path.parent.parent / 'templates' / 'sign.tx').write_text(TEMPLATE)
+        self.map_path.write_text(TEMPLATE_TMX)
+        map_data = self.cache.load(self.map_path)
+        sign = map_data.get_layer_by_name('interactive').objects[0]
+        self.assertEqual((sign.id, sign.x, sign.y, sign.width, sign.height), (4, 32, 32, 16, 16))
+        self.assertEqual(sign.gid, 8)  # The sixth tile of the tileset, whose first GID on the map is 3
+        self.assertEqual(map_data.get_tile_collider(sign.gid), (0, 4, 16, 12))
+        self.assertEqual(sign.properties, {'text': 'object text', 'item': 'BOMB'})
+
+
+class TestMapBundle(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        root = Path(self.temp_dir.name)
+        (root / 'tilesets').mkdir()
+        (root / 'maps').mkdir()
+        (root / 'tilesets' / 'test.tsx').write_text(TSX)
+        self.map_path = root / 'maps' / 'test.tmx'
+        self.map_path.write_text(TMX)
+        self.world_path = root / 'maps' / 'test.world'
+        self.world_path.write_text(WORLD)
+        self.bundle_path = compile_world(self.world_path)
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def test_load(self):
+        map_data = load_map_data(self.map_path)
+        self.assertEqual(map_data.source_paths, [str(self.bundle_path)])
+        self.assertEqual(map_data.collider_rects, [(0, 20, 16, 12), (8, 20, 16, 12)])
+        self.assertEqual(list(map_data.get_layer_by_name('ground').gids), [1, 2, 0, 6, 2147483650, 0])
+        self.assertEqual(map_data.get_tile_collider(6), (0, 4, 16, 12))
+        door = map_data.get_layer_by_name('doors').objects[0]
+        self.assertEqual((door.x, door.y, door.gid), (8, 16, 6))
+        self.assertEqual(door.properties, {'target_x': 3, 'target_door': 'world:map.tmx'})
+        self.assertEqual([os.path.normpath(path) for path in WorldMap(self.world_path).get_needed_images_path()],
+                         [os.path.normpath(self.map_path.parent / '../images/test.png')])
+
+    def test_without_sources(self):
+        """ As in a shipped build """
+        (self.map_path.parent.parent / 'tilesets' / 'test.tsx').unlink()
+        self.map_path.unlink()
+        self.assertEqual(load_map_data(self.map_path).source_paths, [str(self.bundle_path)])
+
+    def test_outdated_bundle(self):
+        os.utime(self.map_path, (0, 0))
+        self.assertIsNone(load_map_data(self.map_path).collider_rects)  # Parsed from the TMX file
+
+
+if __name__ == '__main__':
+    unittest.main()
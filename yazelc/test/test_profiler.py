@@ -0,0 +1,42 @@
+import unittest
+
+from yazelc import zesper
+from yazelc.event.event_queue import EventQueue
+from yazelc.resource_manager import ResourceManager
+
+
+class NestingProcessor(zesper.Processor):
+    """ Processes the world once more from within its own processing, as the door transition does """
+
+    def __init__(self):
+        super().__init__()
+        self.nested = False
+
+    def process(self):
+        if not self.nested:
+            self.nested = True
+            self.world.process()
+            self.nested = False
+
+
+class TestProfiler(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.world = zesper.World(ResourceManager(), EventQueue())
+        self.world.add_processor(NestingProcessor())
+        self.world.enable_profiling()
+        self.profiler = self.world.profiler
+
+    def test_one_sample_per_frame(self):
+        self.world.process()
+        self.assertEqual(len(self.profiler.samples['NestingProcessor']), 1)
+
+    def test_paused(self):
+        with self.profiler.pause():
+            self.world.process()
+            self.profiler.record(self.profiler.EVENT_DISPATCH_SECTION, 1.0)
+        self.assertEqual(self.profiler.names(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
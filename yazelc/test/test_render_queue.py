@@ -0,0 +1,62 @@
+import unittest
+
+import pygame
+
+pygame.init()
+pygame.freetype.init()
+
+from yazelc import components as cmp
+from yazelc import zesper
+from yazelc.event.event_queue import EventQueue
+from yazelc.resource_manager import ResourceManager
+from yazelc.systems.render_system import RenderSystem
+
+
+class TestRenderQueue(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.world = zesper.World(ResourceManager(), EventQueue())
+        image = pygame.Surface((1, 1))
+        self.hud = self.world.create_entity(cmp.Renderable(image, depth=1001), cmp.Position())
+        self.sprite = self.world.create_entity(cmp.Renderable(image, depth=200), cmp.Position())
+        self.background = self.world.create_entity(cmp.Position())
+        self.world.add_component(self.background, cmp.Renderable(image, depth=0))
+
+    def entities_in_queue(self) -> list[int]:
+        return [ent for ent, _ in self.world.render_queue]
+
+    def test_iterates_by_depth(self):
+        self.assertEqual(self.entities_in_queue(), [self.background, self.sprite, self.hud])
+
+    def test_remove_component(self):
+        self.world.remove_component(self.sprite, cmp.Renderable)
+        self.assertEqual(self.entities_in_queue(), [self.background, self.hud])
+
+    def test_delete_entity(self):
+        self.world.delete_entity(self.hud)
+        self.world.process()
+        self.assertEqual(self.entities_in_queue(), [self.background, self.sprite])
+
+    def test_set_render_depth(self):
+        self.world.set_render_depth(self.hud, 100)
+        self.assertEqual(self.entities_in_queue(), [self.background, self.hud, self.sprite])
+
+
+class TestRenderSystem(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.world = zesper.World(ResourceManager(), EventQueue())
+        self.window = pygame.Surface((4, 4))
+        self.render_system = RenderSystem(self.window)
+        self.world.add_processor(self.render_system)
+
+    def test_draws_entity_at_origin(self):
+        image = pygame.Surface((1, 1))
+        image.fill(pygame.Color('white'))
+        self.world.create_entity(cmp.Renderable(image), cmp.Position(0, 0))
+        self.render_system._draw(pygame.Vector2())
+        self.assertEqual(self.window.get_at((0, 0)), pygame.Color('white'))
+
+
+if __name__ == '__main__':
+    unittest.main()
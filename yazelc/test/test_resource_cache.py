@@ -0,0 +1,63 @@
+import unittest
+from pathlib import Path
+
+import pygame
+import pygame.freetype
+
+from yazelc.resource_cache import ResourceCache, ResourceCategory
+from yazelc.resource_manager import ResourceManager
+
+TEXTURE = ResourceCategory.TEXTURE
+
+
+class TestResourceCache(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.cache = ResourceCache({TEXTURE: 100})
+
+    def test_acquire_missing(self):
+        self.assertIsNone(self.cache.acquire(TEXTURE, 'missing'))
+
+    def test_acquire_referenced(self):
+        resource = self.cache.add(TEXTURE, 'a', object(), size=60)
+        self.assertIs(self.cache.acquire(TEXTURE, 'a'), resource)
+        self.cache.add(TEXTURE, 'b', object(), size=60)
+        self.assertEqual(self.cache.size(TEXTURE), 120)  # Over the budget but nothing can be evicted
+
+    def test_unreferenced_kept_within_budget(self):
+        resource = self.cache.add(TEXTURE, 'a', object(), size=60)
+        self.cache.release(TEXTURE, 'a')
+        self.assertIs(self.cache.acquire(TEXTURE, 'a'), resource)
+
+    def test_least_recently_released_evicted(self):
+        for key in ('a', 'b', 'c'):
+            self.cache.add(TEXTURE, key, object(), size=40)
+        self.cache.release(TEXTURE, 'b')
+        self.cache.release(TEXTURE, 'a')
+        self.assertEqual(self.cache.size(TEXTURE), 80)  # Evicted as soon as it is released
+        self.assertNotIn((TEXTURE, 'b'), self.cache)
+        self.assertIn((TEXTURE, 'a'), self.cache)
+        self.cache.add(TEXTURE, 'd', object(), size=30)
+        self.assertNotIn((TEXTURE, 'a'), self.cache)
+        self.assertEqual(self.cache.size(TEXTURE), 70)
+
+
+class TestSharedResources(unittest.TestCase):
+
+    def setUp(self) -> None:
+        pygame.freetype.init()
+        self.cache = ResourceCache()
+        self.font_path = Path(pygame.__file__).parent / pygame.freetype.get_default_font()
+
+    def test_font_sizes(self):
+        intro_font = ResourceManager(self.cache).add_font(self.font_path, 11, pygame.Color('white'))
+        gameplay_manager = ResourceManager(self.cache)
+        dialog_font = gameplay_manager.add_font(self.font_path, 12, pygame.Color('white'), 'dialog')
+        menu_font = gameplay_manager.add_font(self.font_path, 12, pygame.Color('white'), 'menu')
+        self.assertEqual(intro_font.font.size, 11)
+        self.assertEqual(dialog_font.font.size, 12)
+        self.assertIs(menu_font.font, dialog_font.font)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,27 @@
+import unittest
+
+import pygame
+
+from yazelc.utils.spatial_grid import SpatialGrid
+
+
+class TestSpatialGrid(unittest.TestCase):
+    def setUp(self) -> None:
+        self.walls = [pygame.Rect(0, 0, 16, 16), pygame.Rect(40, 8, 16, 16), pygame.Rect(200, 200, 16, 16)]
+        self.grid = SpatialGrid(16, self.walls)
+
+    def test_query_returns_only_neighbouring_rects(self):
+        self.assertEqual(self.grid.query(pygame.Rect(10, 10, 4, 4)), [self.walls[0]])
+        self.assertEqual(self.grid.query(pygame.Rect(100, 100, 4, 4)), [])
+
+    def test_rect_spanning_several_cells_is_returned_once(self):
+        self.assertEqual(self.grid.query(pygame.Rect(32, 0, 32, 32)), [self.walls[1]])
+
+    def test_clear(self):
+        self.grid.clear()
+        self.assertEqual(len(self.grid), 0)
+        self.assertEqual(self.grid.query(pygame.Rect(0, 0, 16, 16)), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
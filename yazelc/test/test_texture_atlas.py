@@ -0,0 +1,42 @@
+import unittest
+
+import pygame
+
+from yazelc.atlas import TextureAtlas
+
+
+class TestTextureAtlas(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.images = {}
+        for idx, size in enumerate([(30, 20), (40, 10), (50, 30), (20, 20), (200, 8)]):
+            image = pygame.Surface(size, flags=pygame.SRCALPHA)
+            image.fill((idx * 40, 255 - idx * 40, 100, 128))
+            self.images[f'image_{idx}'] = image
+        self.atlas = TextureAtlas(self.images, page_size=64)
+
+    def test_regions_keep_pixels(self):
+        self.assertEqual(len(self.atlas), len(self.images))
+        for name, image in self.images.items():
+            region = self.atlas.get(name)
+            self.assertEqual(region.get_size(), image.get_size())
+            self.assertEqual(region.get_at((0, 0)), image.get_at((0, 0)))  # Semi-transparent pixels are not blended
+
+    def test_regions_do_not_overlap(self):
+        regions = [(self.atlas.get(name).get_parent(), self.atlas.get(name).get_abs_offset(), image.get_size())
+                   for name, image in self.images.items()]
+        for idx, (page, offset, size) in enumerate(regions):
+            rect = pygame.Rect(offset, size)
+            self.assertTrue(page.get_rect().contains(rect))
+            for other_page, other_offset, other_size in regions[idx + 1:]:
+                if other_page is page:
+                    self.assertFalse(rect.colliderect(pygame.Rect(other_offset, other_size)))
+
+    def test_large_image_gets_own_page(self):
+        large_image_page = self.atlas.get('image_4').get_parent()
+        self.assertEqual(large_image_page.get_size(), (200, 8))
+        self.assertEqual(len(self.atlas.pages), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
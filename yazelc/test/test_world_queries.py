@@ -0,0 +1,44 @@
+import unittest
+
+from yazelc import components as cmp
+from yazelc import zesper
+from yazelc.event.event_queue import EventQueue
+from yazelc.resource_manager import ResourceManager
+
+
+class TestWorldQueries(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.world = zesper.World(ResourceManager(), EventQueue())
+        self.moving = self.world.create_entity(cmp.Position(), cmp.Velocity(1, 0))
+        self.still = self.world.create_entity(cmp.Position())
+
+    def query(self) -> dict:
+        return dict(self.world.get_components(cmp.Position, cmp.Velocity))
+
+    def test_add_component(self):
+        self.assertEqual(list(self.query()), [self.moving])
+        velocity = cmp.Velocity(0, 1)
+        self.world.add_component(self.still, velocity)
+        self.assertIs(self.query()[self.still][1], velocity)
+
+    def test_remove_component(self):
+        self.query()
+        self.world.remove_component(self.moving, cmp.Velocity)
+        self.assertFalse(self.query())
+
+    def test_delete_entity(self):
+        self.query()
+        self.world.delete_entity(self.moving)
+        self.world.process()
+        self.assertFalse(self.query())
+        self.assertEqual([ent for ent, _ in self.world.get_component(cmp.Position)], [self.still])
+
+    def test_unrelated_change_keeps_result(self):
+        result = self.world.get_components(cmp.Position, cmp.Velocity)
+        self.world.add_component(self.still, cmp.HitBox(0, 0, 1, 1))
+        self.assertIs(self.world.get_components(cmp.Position, cmp.Velocity), result)
+
+
+if __name__ == '__main__':
+    unittest.main()
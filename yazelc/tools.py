@@ -0,0 +1,55 @@
+"""
+Build time tools, e.g., compiles the maps of the worlds into bundles for the shipped builds
+
+    python -m yazelc.tools compile-maps
+    python -m yazelc.tools compile-maps data/overworld/overworld.world
+"""
+import argparse
+import logging
+import os.path
+from pathlib import Path
+
+from yazelc.map import Map, WorldMap
+from yazelc.map_bundle import write_bundle
+from yazelc.map_data import parse_tmx
+
+
+def compile_world(world_map_file_path: Path) -> Path:
+    """ Writes the bundle of the world, with its maps and tilesets, next to the world file """
+    world_map = WorldMap(world_map_file_path)
+    maps = {}
+    image_paths = []
+    source_paths = [str(world_map_file_path)]
+    for map_file_path in world_map.get_map_file_paths():
+        map_data = parse_tmx(map_file_path)
+        map_data.tile_collider_rects, map_data.collider_rects = Map.compile_collider_rects(map_data)
+        maps[Path(os.path.relpath(map_file_path, world_map_file_path.parent)).as_posix()] = map_data
+        image_paths += [tileset.image_path for tileset in map_data.tilesets if tileset.image_path]
+        source_paths += [path for path in map_data.source_paths if path not in source_paths]
+
+    bundle_path = world_map.get_bundle_file_path()
+    write_bundle(bundle_path, maps, image_paths, source_paths)
+    return bundle_path
+
+
+def compile_maps(world_map_file_paths: list[Path]):
+    for world_map_file_path in world_map_file_paths:
+        bundle_path = compile_world(world_map_file_path)
+        logging.info(f'Compiled {world_map_file_path} into {bundle_path} ({os.path.getsize(bundle_path)} bytes)')
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m yazelc.tools', description='Build time tools')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    compile_parser = subparsers.add_parser('compile-maps', help='compiles the maps of the worlds into binary bundles')
+    compile_parser.add_argument('worlds', nargs='*', type=Path,
+                                help=f'world files, all the ones under {Map.DATA_PATH} if none given')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    if args.command == 'compile-maps':
+        compile_maps(args.worlds or sorted(Map.DATA_PATH.rglob(f'*{WorldMap.WORLD_MAP_SUFFIX}')))
+
+
+if __name__ == '__main__':
+    main()
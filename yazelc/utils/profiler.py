@@ -0,0 +1,60 @@
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import NamedTuple
+
+
+class TimingStats(NamedTuple):
+    min: float
+    mean: float
+    p99: float
+
+
+class Profiler:
+    """
+    Keeps the last recorded wall times (in seconds) of the named sections of a frame, e.g., each processor, in ring
+    buffers such that rolling statistics can be computed at any time
+
+    Nothing is recorded while paused, such that the world processing run within a section, e.g., by the door transition
+    handler during the event dispatch, only counts for that section instead of adding samples to every processor
+    """
+    HISTORY_FRAMES = 120
+    FRAME_SECTION = 'Frame'
+    EVENT_DISPATCH_SECTION = 'EventDispatch'
+
+    def __init__(self, history_frames: int = HISTORY_FRAMES):
+        self.history_frames = history_frames
+        self.samples: dict[str, deque[float]] = {}
+        self.last_times: dict[str, float] = {}  # Only the sections recorded on the current (or last) frame
+        self._pause_depth = 0
+
+    def new_frame(self):
+        self.last_times.clear()
+
+    @contextmanager
+    def pause(self) -> Iterator[None]:
+        self._pause_depth += 1
+        try:
+            yield
+        finally:
+            self._pause_depth -= 1
+
+    def record(self, name: str, seconds: float):
+        if self._pause_depth:
+            return
+        if name not in self.samples:
+            self.samples[name] = deque(maxlen=self.history_frames)
+        self.samples[name].append(seconds)
+        self.last_times[name] = seconds
+
+    def stats(self, name: str) -> TimingStats:
+        samples = sorted(self.samples[name])
+        p99_index = min(len(samples) - 1, len(samples) * 99 // 100)
+        return TimingStats(samples[0], sum(samples) / len(samples), samples[p99_index])
+
+    def names(self) -> list[str]:
+        return list(self.samples)
+
+    def clear(self):
+        self.samples.clear()
+        self.last_times.clear()
@@ -0,0 +1,49 @@
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+
+import pygame
+
+
+class SpatialGrid:
+    """
+    Uniform grid that buckets static rects by the cells they overlap. It is meant to be filled once (e.g., on map load)
+    and then queried every frame as a broad phase, such that a moving rect only gets tested against the rects that
+    live in the cells it overlaps instead of against all of them.
+    """
+
+    def __init__(self, cell_size: int, rects: Iterable[pygame.Rect] = ()):
+        self.cell_size = cell_size
+        self._rects: list[pygame.Rect] = []
+        self._cells: defaultdict[tuple[int, int], list[int]] = defaultdict(list)
+        for rect in rects:
+            self.insert(rect)
+
+    def insert(self, rect: pygame.Rect):
+        index = len(self._rects)
+        self._rects.append(rect)
+        for cell in self._cells_overlapping(rect):
+            self._cells[cell].append(index)
+
+    def query(self, rect: pygame.Rect) -> list[pygame.Rect]:
+        """ Returns the stored rects sharing a cell with the input rect in insertion order and without duplicates """
+        indices = set()
+        for cell in self._cells_overlapping(rect):
+            if cell in self._cells:
+                indices.update(self._cells[cell])
+        return [self._rects[index] for index in sorted(indices)]
+
+    def clear(self):
+        self._rects.clear()
+        self._cells.clear()
+
+    def __len__(self):
+        return len(self._rects)
+
+    def _cells_overlapping(self, rect: pygame.Rect) -> Iterator[tuple[int, int]]:
+        min_cell_x = rect.left // self.cell_size
+        min_cell_y = rect.top // self.cell_size
+        max_cell_x = (rect.right - 1) // self.cell_size if rect.width > 0 else min_cell_x
+        max_cell_y = (rect.bottom - 1) // self.cell_size if rect.height > 0 else min_cell_y
+        for cell_x in range(min_cell_x, max_cell_x + 1):
+            for cell_y in range(min_cell_y, max_cell_y + 1):
+                yield cell_x, cell_y
@@ -1,10 +1,13 @@
 """ Module extends the esper package"""
-from typing import TypeVar, Optional, Union, Type
+from time import perf_counter
+from typing import TypeVar, Optional, Union, Type, Any
 
 import esper
 
 from yazelc.event.event_queue import EventQueue
+from yazelc.render_queue import RenderQueue
 from yazelc.resource_manager import ResourceManager
+from yazelc.utils.profiler import Profiler
 
 C = TypeVar('C')
 C_alt = TypeVar('C_alt')  # alternative component
@@ -14,12 +17,78 @@ class World(esper.World):
     """
     Adds resource management and event queue reference to be used by systems.
     Additional helpful methods are included
+
+    It also keeps the render queue, i.e., the renderable components sorted by depth, up to date as these are added or
+    removed such that the render system does not need to sort them on every frame
+
+    The component queries are cached as views that are updated incrementally as components are added or removed. A
+    change only invalidates the returned lists of the queries involving the changed component type, instead of all the
+    query results as esper does
     """
 
     def __init__(self, resource_manager: ResourceManager, event_queue: EventQueue):
         super().__init__()
         self.resource_manager = resource_manager
         self.event_queue = event_queue
+        from yazelc.components import Renderable, ChunkedRenderable  # Imported here as the components depend on this module
+        self.render_queue = RenderQueue(Renderable, ChunkedRenderable)
+        self.profiler: Optional[Profiler] = None
+        self._views: dict[tuple[type, ...], dict[int, tuple]] = {}  # Components of the matching entities per query
+        self._views_by_type: dict[type, list[tuple[type, ...]]] = {}
+        self._query_results: dict[Union[type, tuple[type, ...]], list] = {}  # By component type or by view
+
+    def enable_profiling(self, enable: bool = True):
+        """ Opt-in recording of the wall time of every processor (named after its class) on every frame """
+        if not enable:
+            self.profiler = None
+        elif self.profiler is None:
+            self.profiler = Profiler()
+
+    def create_entity(self, *components: C) -> int:
+        entity = super().create_entity(*components)
+        for component in components:
+            self._on_component_added(entity, type(component))
+            if self.render_queue.tracks(component):
+                self.render_queue.add(entity, component)
+        return entity
+
+    def add_component(self, entity: int, component_instance: C, type_alias: Optional[Type[C]] = None) -> None:
+        super().add_component(entity, component_instance, type_alias)
+        self._on_component_added(entity, type_alias or type(component_instance))
+        if self.render_queue.tracks(component_instance):
+            self.render_queue.add(entity, component_instance)
+
+    def remove_component(self, entity: int, component_type: Type[C]) -> C:
+        component = super().remove_component(entity, component_type)
+        self._on_component_removed(entity, component_type)
+        if self.render_queue.tracks(component):
+            self.render_queue.remove(entity)
+        return component
+
+    def delete_entity(self, entity: int, immediate: bool = False) -> None:
+        if immediate:
+            for component_type in self._entities[entity]:
+                self._on_component_removed(entity, component_type)
+            self.render_queue.remove(entity)
+        super().delete_entity(entity, immediate)
+
+    def get_component(self, component_type: Type[C]) -> list[tuple[int, C]]:
+        if (result := self._query_results.get(component_type)) is None:
+            result = self._query_results[component_type] = list(self._get_component(component_type))
+        return result
+
+    def get_components(self, *component_types: Type[Any]) -> list[tuple[int, tuple[Any, ...]]]:
+        if (result := self._query_results.get(component_types)) is None:
+            if component_types not in self._views:
+                self._create_view(component_types)
+            result = self._query_results[component_types] = list(self._views[component_types].items())
+        return result
+
+    def set_render_depth(self, entity: int, depth: int):
+        """ Depth changes of renderables have to go through here to move the entity to its new render queue bucket """
+        renderable = self.render_queue.get(entity)
+        renderable.depth = depth
+        self.render_queue.add(entity, renderable)
 
     def try_pair_signature(self, ent_1: int, ent_2: int, component_type_1: Type[C], component_type_2: Type[C_alt]) \
             -> Union[tuple[int, C, int, C_alt], tuple[int, C_alt, int, C], None]:
@@ -27,15 +96,14 @@ class World(esper.World):
         Checks if the pair have each the corresponding input pair components in the two possible permutations.
         If found returns the entities paired with their respective components
         """
-        component_1_1 = self.try_component(ent_1, component_type_1)
-        component_2_2 = self.try_component(ent_2, component_type_2)
+        entity_components_1 = self._entities[ent_1]
+        entity_components_2 = self._entities[ent_2]
 
-        component_1_2 = self.try_component(ent_1, component_type_2)
-        component_2_1 = self.try_component(ent_2, component_type_1)
-
-        if component_1_1 and component_2_2:
+        if (component_1_1 := entity_components_1.get(component_type_1)) and \
+                (component_2_2 := entity_components_2.get(component_type_2)):
             return ent_1, component_1_1, ent_2, component_2_2
-        elif component_1_2 and component_2_1:
+        elif (component_1_2 := entity_components_1.get(component_type_2)) and \
+                (component_2_1 := entity_components_2.get(component_type_1)):
             return ent_2, component_2_1, ent_1, component_1_2
         else:
             return None
@@ -44,11 +112,9 @@ class World(esper.World):
         """
         Same as above but only checked on a single entity
         """
-        component_1 = self.try_component(ent_1, component_type)
-        component_2 = self.try_component(ent_2, component_type)
-        if component_1:
+        if component_1 := self._entities[ent_1].get(component_type):
             return ent_1, component_1, ent_2
-        elif component_2:
+        elif component_2 := self._entities[ent_2].get(component_type):
             return ent_2, component_2, ent_1
         else:
             return None
@@ -65,8 +131,50 @@ class World(esper.World):
 
     def clear_database(self) -> None:
         super().clear_database()
+        self._views.clear()
+        self._views_by_type.clear()
+        self._query_results.clear()
+        self.render_queue.clear()
         self.clear_processors()
 
+    def _process(self, *args, **kwargs):
+        if self.profiler is None:
+            super()._process(*args, **kwargs)
+            return
+        for processor in self._processors:
+            start = perf_counter()
+            with self.profiler.pause():  # A nested world processing counts for this processor only
+                processor.process(*args, **kwargs)
+            self.profiler.record(type(processor).__name__, perf_counter() - start)
+
+    def _clear_dead_entities(self):
+        for entity in self._dead_entities:
+            for component_type in self._entities[entity]:
+                self._on_component_removed(entity, component_type)
+            self.render_queue.remove(entity)
+        super()._clear_dead_entities()
+
+    def _create_view(self, component_types: tuple[type, ...]):
+        self._views[component_types] = {entity: tuple(components) for entity, components in
+                                        self._get_components(*component_types)}
+        for component_type in component_types:
+            self._views_by_type.setdefault(component_type, []).append(component_types)
+
+    def _on_component_added(self, entity: int, component_type: type):
+        """ Also called when a component is replaced, so the views get the new instance """
+        self._query_results.pop(component_type, None)
+        entity_components = self._entities[entity]
+        for component_types in self._views_by_type.get(component_type, ()):
+            if all(view_type in entity_components for view_type in component_types):
+                self._views[component_types][entity] = tuple(entity_components[view_type] for view_type in component_types)
+                self._query_results.pop(component_types, None)
+
+    def _on_component_removed(self, entity: int, component_type: type):
+        self._query_results.pop(component_type, None)
+        for component_types in self._views_by_type.get(component_type, ()):
+            if self._views[component_types].pop(entity, None) is not None:
+                self._query_results.pop(component_types, None)
+
 
 class Processor(esper.Processor):  # noqa
     world: World